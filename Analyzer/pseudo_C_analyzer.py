@@ -1,6 +1,23 @@
 import os
 import re
 import sys
+import argparse
+import gzip
+import hashlib
+import json
+import mmap
+import sqlite3
+import time
+import tracemalloc
+import zlib
+import struct
+from array import array
+from bisect import bisect_left
+from collections import Counter, namedtuple
+from collections.abc import Mapping, MutableMapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from itertools import accumulate
 from pathlib import Path
 import fnmatch
 
@@ -19,6 +36,9 @@ FUNCTION_PATTERNS = [
     r'^\s*\*+\s*(?:volatile\s+)?(?:__int\d*\s+)?\*+\s*(?:\w+\s+)*?(\w+(?:\s+\w+)*)\s*\(',
 ]
 
+# files larger than this are cut into chunks when running with --jobs
+PARALLEL_CHUNK_SIZE = 512 * 1024
+
 CALL_PATTERNS = [
     # basic function calls: functionName(
     r'(\w+)\s*\(',
@@ -26,6 +46,14 @@ CALL_PATTERNS = [
     r'return\s+(\w+)\s*\(',
 ]
 
+# write buffer for output files, and the suffix each compression mode adds
+OUTPUT_BUFFER = 1024 * 1024
+OUTPUT_SUFFIXES = {None: '', 'gzip': '.gz', 'zstd': '.zst'}
+
+# bump when extraction logic changes in a way the patterns above don't show
+CACHE_FORMAT = 2
+CACHE_MAX_SIZE = 512 * 1024 * 1024
+
 # use file 0 for starting point
 def find_entry_point(functions):
     if not functions:
@@ -46,10 +74,193 @@ def clean_function_name(name):
             return ' '.join(parts[1:])
     return name
 
+# name, first/last line index of the function (header to closing brace), offsets of that range
+# and the indexes of the comment/declaration lines picked up above the header
+FunctionSpan = namedtuple('FunctionSpan', ['name', 'start_line', 'end_line', 'start', 'end', 'head'])
+
+class FunctionScanner:
+    """
+    1. walk the lines once, recording brace depth and the lines holding '{' or '}'
+    2. collect header candidates on the same pass (every FUNCTION_PATTERNS needs a '(')
+    3. resolve each candidate's closing line with a bisect on the depth index
+    4. apply the same validity rules as the legacy extractor without re-reading the body
+    5. return: function spans in source order
+    """
+    def __init__(self, lines, offsets=None):
+        self.lines = lines
+        if offsets is None:
+            offsets = [length + n for n, length in enumerate(accumulate(map(len, lines), initial=0))]
+        self.offsets = offsets
+
+    def scan(self):
+        self.index()
+        for i, func_name, start_depth in self.candidates:
+            span = self.resolve(i, func_name, start_depth, self.closing_line(i, start_depth))
+            if span:
+                yield span
+
+    # single pass over lines[first_line:]; earlier lines only serve as head context
+    def index(self, first_line=0):
+        open_lines = []
+        close_lines = {}
+        candidates = []
+        depth = 0
+
+        for i in range(first_line, len(self.lines)):
+            line = self.lines[i]
+            if '(' in line:
+                stripped_line = line.strip()
+                if not stripped_line.startswith(('//', '/*')) and not FunctionExtractor.is_function_call(stripped_line):
+                    func_name = FunctionExtractor.find_function_name(stripped_line)
+                    if func_name:
+                        candidates.append((i, func_name, depth))
+
+            opens = line.count('{')
+            closes = line.count('}')
+            if opens:
+                open_lines.append(i)
+            depth += opens - closes
+            if closes:
+                close_lines.setdefault(depth, []).append(i)
+
+        self.candidates = candidates
+        self.open_lines = open_lines
+        self.close_lines = close_lines
+        self.depth = depth
+
+    # line where the legacy brace walk stops, None if it runs off the end
+    def closing_line(self, i, start_depth):
+        k = bisect_left(self.open_lines, i)
+        if k < len(self.open_lines):
+            same_depth = self.close_lines.get(start_depth, ())
+            m = bisect_left(same_depth, self.open_lines[k])
+            if m < len(same_depth):
+                return same_depth[m]
+        return None
+
+    # apply the legacy validity rules to the header at line i
+    def resolve(self, i, func_name, start_depth, end):
+        lines = self.lines
+        k = bisect_left(self.open_lines, i)
+        head = FunctionExtractor.head_lines(lines, i, func_name)
+        head_balance = sum(lines[h].count('{') - lines[h].count('}') for h in head)
+        body_balance = 0 if end is not None else self.depth - start_depth
+        has_open = any('{' in lines[h] for h in head) or k < len(self.open_lines)
+        if not has_open or head_balance + body_balance != 0:
+            return None
+        if end is None:
+            end = len(lines) - 1
+
+        seq = head + [i]
+        first = next(n for n, idx in enumerate(seq) if lines[idx].strip())
+        tail = end
+        while tail > i and not lines[tail].strip():
+            tail -= 1
+        size = len(seq) - first + tail - i
+        if size < 2:
+            return None
+
+        window = [lines[idx] for idx in seq[first:]] + lines[i + 1:min(tail, i + 5) + 1]
+        window = window[:5]
+        window[0] = window[0].lstrip()
+        if size <= 5:
+            window[-1] = window[-1].rstrip()
+        if not FunctionExtractor.name_in_header('\n'.join(window), func_name):
+            return None
+
+        return FunctionSpan(func_name, i, end, self.offsets[i], self.offsets[end + 1] - 1, tuple(head))
+
+    def body(self, span):
+        return '\n'.join([self.lines[h] for h in span.head] + self.lines[span.start_line:span.end_line + 1]).strip()
+
 class FunctionExtractor:
-    # main parser for codebase
+    regexes = [re.compile(pattern) for pattern in FUNCTION_PATTERNS]
+
+    # main parser for codebase, legacy=True keeps the original per-line regex and body rescan
     @staticmethod
-    def extract_functions(content):
+    def extract_functions(content, legacy=False):
+        if legacy:
+            return FunctionExtractor.extract_functions_legacy(content)
+
+        scanner = FunctionScanner(content.split('\n'))
+        spans = {}
+        for span in scanner.scan():
+            spans[span.name] = span
+        return {name: scanner.body(span) for name, span in spans.items()}
+
+    # extract every file, serving unchanged ones from the cache; returns (functions, call lists) per file, None on failure
+    @staticmethod
+    def extract_files(paths, jobs=1, legacy=False, cache=None, mapped=False, profiler=None):
+        mapped = mapped and not legacy
+        results = [None] * len(paths)
+        digests = {}
+        todo = []
+        
+        for n, path in enumerate(paths):
+            if cache:
+                digest, entry = cache.load(path, mapped)
+                digests[n] = digest
+                if entry:
+                    results[n] = entry
+                    continue
+            todo.append(n)
+        
+        if jobs > 1:
+            with profiler.stage('extraction') if profiler else nullcontext():
+                extracted = ParallelExtractor.extract_files([paths[n] for n in todo], jobs, legacy, mapped)
+        else:
+            extracted = []
+            for n in todo:
+                try:
+                    if profiler:
+                        extracted.append(profiler.extract_file(paths[n], legacy, mapped))
+                    elif mapped:
+                        extracted.append(FunctionExtractor.extract_mapped(paths[n]))
+                    else:
+                        extracted.append(FunctionExtractor.extract_file(paths[n], legacy))
+                except Exception:
+                    extracted.append(None)
+        
+        for n, functions in zip(todo, extracted):
+            if functions is None:
+                continue
+            if cache:
+                calls = {name: CallGraphBuilder.extract_calls(name, body) for name, body in functions.items()}
+                if digests[n]:
+                    cache.store(paths[n], digests[n], functions, calls)
+                results[n] = (functions, calls)
+            else:
+                results[n] = (functions, None)
+        
+        if cache:
+            cache.evict()
+        return results
+
+    @staticmethod
+    def extract_file(path, legacy=False):
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            return FunctionExtractor.extract_functions(f.read(), legacy)
+
+    # same functions as extract_file, but kept as byte ranges in a FunctionStore
+    @staticmethod
+    def extract_mapped(path):
+        store = FunctionStore()
+        source = store.add_source(path)
+        lines = store.lines(source)
+        if lines is None:
+            store.update(FunctionExtractor.extract_file(path))
+            return store
+        
+        spans = {}
+        for span in FunctionScanner(lines, lines.starts).scan():
+            spans[span.name] = span
+        for name, span in spans.items():
+            head = tuple((lines.starts[h], lines.starts[h + 1] - 1) for h in span.head)
+            store.set_span(name, source, head, span.start, span.end)
+        return store
+
+    @staticmethod
+    def extract_functions_legacy(content):
         functions = {}
         lines = content.split('\n')
         
@@ -69,8 +280,8 @@ class FunctionExtractor:
     # get single line of code from extract_functions, and returns function name
     @staticmethod
     def find_function_name(line):
-        for pattern in FUNCTION_PATTERNS:
-            match = re.search(pattern, line)
+        for pattern in FunctionExtractor.regexes:
+            match = pattern.search(line)
             if match:
                 name = match.group(1).strip()                
                 name = clean_function_name(name)
@@ -91,32 +302,41 @@ class FunctionExtractor:
         if len(lines) < 2:
             return False
         
-        func_name_parts = func_name.split()
-        first_lines = '\n'.join(lines[:5])
-        name_found = all(part in first_lines for part in func_name_parts) if len(func_name_parts) > 1 else func_name in first_lines
-        
-        if not name_found:
+        if not FunctionExtractor.name_in_header('\n'.join(lines[:5]), func_name):
             return False
         
         open_braces = func_body.count('{')
         close_braces = func_body.count('}')
         
         return open_braces > 0 and open_braces == close_braces
-    
-    # extract function body start from function name
+
+    # the function name must show up in the first lines of its body
     @staticmethod
-    def extract_function_body(lines, start_line, func_name):
-        result = []
-        brace_count = 0
-        found_opening = False
-        
+    def name_in_header(first_lines, func_name):
+        func_name_parts = func_name.split()
+        if len(func_name_parts) > 1:
+            return all(part in first_lines for part in func_name_parts)
+        return func_name in first_lines
+
+    # up to 5 lines above the header that belong to the function (comments, blanks, signature pieces)
+    @staticmethod
+    def head_lines(lines, start_line, func_name):
+        head = []
         for j in range(max(0, start_line - 5), start_line):
             line = lines[j].strip()
             if line and (line.startswith('//') or any(part in line for part in func_name.split()) or 
                          any(kw in line.lower() for kw in {'void', 'int', 'char', '__int64', 'unsigned', 'volatile'})):
-                result.append(lines[j])
+                head.append(j)
             elif not line:
-                result.append(lines[j])
+                head.append(j)
+        return head
+    
+    # extract function body start from function name
+    @staticmethod
+    def extract_function_body(lines, start_line, func_name):
+        result = [lines[j] for j in FunctionExtractor.head_lines(lines, start_line, func_name)]
+        brace_count = 0
+        found_opening = False
         
         i = start_line
         while i < len(lines):
@@ -134,6 +354,414 @@ class FunctionExtractor:
         
         return '\n'.join(result)
 
+class MappedLines(Sequence):
+    # lines of a mapped file, decoded one at a time; starts[i] is the byte offset of line i
+    def __init__(self, data, crlf=False):
+        self.data = data
+        self.crlf = crlf
+        starts = array('Q', [0])
+        pos = data.find(b'\n')
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = data.find(b'\n', pos + 1)
+        starts.append(len(data) + 1)
+        self.starts = starts
+    
+    def __len__(self):
+        return len(self.starts) - 1
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[n] for n in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        line = self.data[self.starts[i]:self.starts[i + 1] - 1].decode('utf-8', errors='ignore')
+        if self.crlf and line.endswith('\r'):
+            line = line[:-1]
+        return line
+
+class FunctionStore(MutableMapping):
+    """
+    1. keep (source file, head line ranges, byte start, byte end) per function instead of its body
+    2. map each source file with mmap on first use and decode a body only when it is asked for
+    3. plain strings can be stored too (files that can't be mapped, cached text entries)
+    4. behaves like the all_functions dict: insertion order kept, last assignment wins
+    """
+    def __init__(self):
+        self.sources = []
+        self.entries = {}
+        self.maps = {}
+        self.crlf = {}
+    
+    # worker processes hand stores back without their mappings
+    def __getstate__(self):
+        return {'sources': self.sources, 'entries': self.entries}
+    
+    def __setstate__(self, state):
+        self.__init__()
+        self.sources = state['sources']
+        self.entries = state['entries']
+    
+    @staticmethod
+    def from_locations(path, locations):
+        store = FunctionStore()
+        source = store.add_source(path)
+        for name, location in locations.items():
+            if isinstance(location, str):
+                store[name] = location
+            else:
+                head, start, end = location
+                store.set_span(name, source, tuple(tuple(line) for line in head), start, end)
+        return store
+    
+    # json friendly form of a single-file store, see from_locations
+    def locations(self):
+        return {name: entry if isinstance(entry, str) else [entry[1], entry[2], entry[3]]
+                for name, entry in self.entries.items()}
+    
+    def add_source(self, path):
+        path = str(path)
+        if path not in self.sources:
+            self.sources.append(path)
+        return self.sources.index(path)
+    
+    # None if the file can't be served from byte offsets (empty, or lone CR line breaks)
+    def map(self, source):
+        if source not in self.maps:
+            data = None
+            with open(self.sources[source], 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            crlf = False
+            pos = data.find(b'\r') if data is not None else -1
+            while pos != -1:
+                if data[pos + 1:pos + 2] != b'\n':
+                    data.close()
+                    data = None
+                    break
+                crlf = True
+                pos = data.find(b'\r', pos + 2)
+            self.maps[source] = data
+            self.crlf[source] = crlf
+        return self.maps[source]
+    
+    def lines(self, source):
+        data = self.map(source)
+        return MappedLines(data, self.crlf[source]) if data is not None else None
+    
+    def set_span(self, name, source, head, start, end):
+        self.entries[name] = (source, head, start, end)
+    
+    def read(self, entry):
+        source, head, start, end = entry
+        data = self.map(source)
+        pieces = [data[a:b].decode('utf-8', errors='ignore') for a, b in head]
+        pieces.append(data[start:end].decode('utf-8', errors='ignore'))
+        if self.crlf[source]:
+            pieces = [piece.replace('\r\n', '\n').removesuffix('\r') for piece in pieces]
+        return '\n'.join(pieces).strip()
+    
+    def __getitem__(self, name):
+        entry = self.entries[name]
+        return entry if isinstance(entry, str) else self.read(entry)
+    
+    def __setitem__(self, name, body):
+        self.entries[name] = body
+    
+    def __delitem__(self, name):
+        del self.entries[name]
+    
+    def __iter__(self):
+        return iter(self.entries)
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def __contains__(self, name):
+        return name in self.entries
+    
+    def update(self, other=()):
+        if not isinstance(other, FunctionStore):
+            return super().update(other)
+        sources = [self.add_source(path) for path in other.sources]
+        for name, entry in other.entries.items():
+            self.entries[name] = entry if isinstance(entry, str) else (sources[entry[0]],) + entry[1:]
+    
+    def close(self):
+        for data in self.maps.values():
+            if data is not None:
+                data.close()
+        self.maps.clear()
+
+class ParallelExtractor:
+    """
+    1. small files are extracted whole, one pool task per file
+    2. big files are cut into chunks right after top-level closing braces ("}" alone on a line)
+    3. each chunk is scanned with up to 5 lines of context above it so head lines match
+    4. headers whose body runs past their chunk are resolved on the merged brace index
+    5. return: one function dict per file (None if it failed), in the order the files were given
+    with mapped=True every file is one task returning a FunctionStore, so only offsets cross processes
+    """
+    @staticmethod
+    def extract_files(paths, jobs, legacy=False, mapped=False):
+        results = {}
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            pending = {path: pool.submit(FunctionExtractor.extract_mapped, path) for path in paths} if mapped else {}
+            pending.update({path: pool.submit(FunctionExtractor.extract_file, path, legacy) for path in paths
+                            if not mapped and (legacy or path.stat().st_size <= PARALLEL_CHUNK_SIZE)})
+            
+            for path in paths:
+                if path in pending:
+                    continue
+                try:
+                    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                        content = f.read()
+                    chunk_size = max(PARALLEL_CHUNK_SIZE, len(content) // jobs + 1)
+                    chunks = [pool.submit(ParallelExtractor.extract_chunk, *chunk)
+                              for chunk in ParallelExtractor.split_content(content, chunk_size)]
+                    results[path] = ParallelExtractor.merge_chunks(content, [chunk.result() for chunk in chunks])
+                except Exception:
+                    results[path] = None
+            
+            for path, future in pending.items():
+                try:
+                    results[path] = future.result()
+                except Exception:
+                    results[path] = None
+        
+        return [results[path] for path in paths]
+    
+    # yield (text, context lines, first line number) for each chunk of content
+    @staticmethod
+    def split_content(content, chunk_size):
+        cuts = [0]
+        pos = chunk_size
+        while pos < len(content):
+            cut = content.find('\n}\n', pos)
+            if cut == -1:
+                break
+            cuts.append(cut + 3)
+            pos = cut + 3 + chunk_size
+        cuts.append(len(content) + 1)
+        
+        first_line = 0
+        for start, end in zip(cuts, cuts[1:]):
+            context_start, context = start, 0
+            while context_start > 0 and context < 5:
+                context_start = content.rfind('\n', 0, context_start - 1) + 1
+                context += 1
+            yield content[context_start:end - 1], context, first_line
+            first_line += content.count('\n', start, end)
+    
+    # scan one chunk; line numbers in the result are file-wide
+    @staticmethod
+    def extract_chunk(text, context, first_line):
+        scanner = FunctionScanner(text.split('\n'))
+        scanner.index(context)
+        shift = first_line - context
+        spans = {}
+        first_seen = {}
+        unresolved = []
+        
+        for i, func_name, start_depth in scanner.candidates:
+            end = scanner.closing_line(i, start_depth)
+            if end is None:
+                unresolved.append((i + shift, func_name, start_depth))
+                continue
+            span = scanner.resolve(i, func_name, start_depth, end)
+            if span:
+                first_seen.setdefault(func_name, i + shift)
+                spans[func_name] = span
+        
+        found = [(first_seen[name], span.start_line + shift, name, scanner.body(span)) for name, span in spans.items()]
+        open_lines = [i + shift for i in scanner.open_lines]
+        close_lines = {depth: [i + shift for i in lines] for depth, lines in scanner.close_lines.items()}
+        return found, unresolved, open_lines, close_lines, scanner.depth
+    
+    # combine chunk results into the dict a serial extract_functions would return
+    @staticmethod
+    def merge_chunks(content, chunk_results):
+        entries = [entry for result in chunk_results for entry in result[0]]
+        
+        if any(result[1] for result in chunk_results):
+            scanner = FunctionScanner(content.split('\n'))
+            scanner.open_lines, scanner.close_lines = [], {}
+            unresolved = []
+            base = 0
+            for _, pending, open_lines, close_lines, depth in chunk_results:
+                unresolved.extend((i, func_name, start_depth + base) for i, func_name, start_depth in pending)
+                scanner.open_lines.extend(open_lines)
+                for close_depth, lines in close_lines.items():
+                    scanner.close_lines.setdefault(close_depth + base, []).extend(lines)
+                base += depth
+            scanner.depth = base
+            
+            for i, func_name, start_depth in unresolved:
+                span = scanner.resolve(i, func_name, start_depth, scanner.closing_line(i, start_depth))
+                if span:
+                    entries.append((i, i, func_name, scanner.body(span)))
+        
+        first_seen, last_seen = {}, {}
+        for first, last, name, body in entries:
+            if name not in first_seen or first < first_seen[name]:
+                first_seen[name] = first
+            if name not in last_seen or last > last_seen[name][0]:
+                last_seen[name] = (last, body)
+        
+        return {name: last_seen[name][1] for name in sorted(first_seen, key=first_seen.get)}
+
+class ExtractionCache:
+    """
+    1. keep one json entry per source file in a directory next to IDA_Files
+    2. reuse an entry only while the file's sha256 and the pattern version (patterns and extractor) still match
+    3. each entry holds the extracted functions and every function's call list
+    4. evict least recently used entries once the cache grows past max_size
+    """
+    def __init__(self, directory, max_size=CACHE_MAX_SIZE, legacy=False):
+        directory = Path(directory).resolve()
+        self.cache_dir = directory.parent / f"{directory.name}.analyzer_cache"
+        self.max_size = max_size
+        self.version = ExtractionCache.pattern_version(legacy)
+        self.hits = 0
+        self.cache_dir.mkdir(exist_ok=True)
+    
+    # changes whenever FUNCTION_PATTERNS, CALL_PATTERNS or CACHE_FORMAT change, and between the fast and the
+    # legacy extractor, so a --legacy-extractor run never reuses what the fast one extracted (or the reverse)
+    @staticmethod
+    def pattern_version(legacy=False):
+        extractor = 'legacy' if legacy else 'fast'
+        return hashlib.sha256(json.dumps([CACHE_FORMAT, FUNCTION_PATTERNS, CALL_PATTERNS, extractor]).encode()).hexdigest()[:16]
+    
+    @staticmethod
+    def file_digest(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+    
+    def entry_path(self, path):
+        return self.cache_dir / f"{hashlib.sha256(str(Path(path).resolve()).encode()).hexdigest()[:32]}.json"
+    
+    # returns (sha256 of the file, (functions, calls) or None); mapped entries hold byte ranges, not bodies
+    def load(self, path, mapped=False):
+        try:
+            digest = ExtractionCache.file_digest(path)
+        except OSError:
+            return None, None
+        
+        entry_path = self.entry_path(path)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return digest, None
+        
+        if (entry.get('version') != self.version or entry.get('sha256') != digest or
+                entry.get('mapped', False) != mapped):
+            return digest, None
+        
+        os.utime(entry_path)
+        self.hits += 1
+        functions = {name: body for name, (body, _) in entry['functions'].items()}
+        if mapped:
+            functions = FunctionStore.from_locations(path, functions)
+        calls = {name: calls for name, (_, calls) in entry['functions'].items()}
+        return digest, (functions, calls)
+    
+    def store(self, path, digest, functions, calls):
+        mapped = isinstance(functions, FunctionStore)
+        if mapped:
+            functions = functions.locations()
+        entry = {
+            'version': self.version,
+            'path': str(path),
+            'sha256': digest,
+            'mapped': mapped,
+            'functions': {name: [body, calls[name]] for name, body in functions.items()}
+        }
+        entry_path = self.entry_path(path)
+        temp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(temp_path, entry_path)
+        except OSError:
+            FileManager.delete_files([temp_path])
+    
+    def evict(self):
+        entries = []
+        for entry_path in self.cache_dir.glob("*.json"):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_size:
+                break
+            FileManager.delete_files([entry_path])
+            total -= size
+
+class GlobMatcher:
+    """
+    1. split fnmatch patterns into exact names, prefix globs (runtime__*), suffix globs (*WORD) and the rest
+    2. keep prefixes and suffixes in one set per length, so a lookup costs one slice per distinct length
+    3. compile the remaining globs into a single regex alternation
+    4. return: the same answer as any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+    """
+    def __init__(self, patterns):
+        self.exact = set()
+        self.prefixes = {}
+        self.suffixes = {}
+        general = []
+        
+        for pattern in patterns:
+            pattern = os.path.normcase(pattern)
+            body = pattern.strip('*')
+            if any(char in body for char in '*?['):
+                general.append(pattern)
+            elif pattern == body:
+                self.exact.add(pattern)
+            elif pattern == body + '*':
+                self.prefixes.setdefault(len(body), set()).add(body)
+            elif pattern == '*' + body:
+                self.suffixes.setdefault(len(body), set()).add(body)
+            else:
+                general.append(pattern)
+        
+        self.general = re.compile('|'.join(fnmatch.translate(pattern) for pattern in general)) if general else None
+    
+    def matches(self, name):
+        name = os.path.normcase(name)
+        if name in self.exact:
+            return True
+        if any(name[:length] in prefixes for length, prefixes in self.prefixes.items() if length <= len(name)):
+            return True
+        if any(name[len(name) - length:] in suffixes for length, suffixes in self.suffixes.items() if length <= len(name)):
+            return True
+        return bool(self.general and self.general.match(name))
+
+class LibraryMatcher:
+    # both library sections compiled once, with memoized answers per name
+    def __init__(self, lib_functions, lib_non_functions):
+        self.functions = GlobMatcher(lib_functions)
+        self.non_functions = GlobMatcher(lib_non_functions)
+        self.memo = {}
+    
+    # 'FUNCTIONS', 'NON-FUNCTIONS' or None, checked in the same order as the lib file sections
+    def classify(self, name):
+        if name not in self.memo:
+            if self.functions.matches(name):
+                self.memo[name] = 'FUNCTIONS'
+            elif self.non_functions.matches(name):
+                self.memo[name] = 'NON-FUNCTIONS'
+            else:
+                self.memo[name] = None
+        return self.memo[name]
+
 class LibraryManager:
     # load pseudo_C_analyzer_lib.txt file that erase noise by whitelisting function and blacklisting non-function
     @staticmethod
@@ -152,10 +780,10 @@ class LibraryManager:
                     if not line or line.startswith('#'):
                         continue
                     
-                    if 'FUNCTIONS' in line.upper() and '===' in line:
-                        current_section = 'FUNCTIONS'
-                    elif 'NON-FUNCTIONS' in line.upper() and '===' in line:
+                    if 'NON-FUNCTIONS' in line.upper() and '===' in line:
                         current_section = 'NON-FUNCTIONS'
+                    elif 'FUNCTIONS' in line.upper() and '===' in line:
+                        current_section = 'FUNCTIONS'
                     elif current_section == 'FUNCTIONS':
                         functions.add(line)
                     elif current_section == 'NON-FUNCTIONS':
@@ -164,11 +792,16 @@ class LibraryManager:
             pass
         
         return functions, non_functions
-    
-    # use wildcard (runtime__*) to match with function names
+
+    # compiled form of both sections, reused while the library content stays the same
+    _matchers = {}
+
     @staticmethod
-    def matches_pattern(name, patterns):
-        return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+    def compile_library(lib_functions, lib_non_functions):
+        key = (frozenset(lib_functions), frozenset(lib_non_functions))
+        if key not in LibraryManager._matchers:
+            LibraryManager._matchers[key] = LibraryMatcher(lib_functions, lib_non_functions)
+        return LibraryManager._matchers[key]
 
     # creat pseudo_C_analyzer_lib.txt if absent
     @staticmethod
@@ -178,55 +811,346 @@ class LibraryManager:
                     "=== NON-FUNCTIONS ===\n# add non-function names here, one per line\n\n")
         print(f"created empty {lib_file}")
 
+class CallGraph(Mapping):
+    """
+    1. intern every name: defined functions first (in all_functions order), then missing ones
+    2. store calls as compressed sparse rows, offsets[i]..offsets[i + 1] index into targets
+    3. call_map[name] still returns callee names, so it drops in where the dict was used
+    4. save/load write the name table and both arrays to a compact binary file
+    """
+    MAGIC = b'PCAG'
+    FORMAT = 1
+    
+    def __init__(self, names, defined, offsets, targets):
+        self.names = names
+        self.defined = defined
+        self.offsets = offsets
+        self.targets = targets
+        self.index = {name: i for i, name in enumerate(names)}
+    
+    @staticmethod
+    def from_call_map(call_map):
+        names = [sys.intern(name) for name in call_map]
+        index = {name: i for i, name in enumerate(names)}
+        defined = len(names)
+        offsets = array('I', [0])
+        targets = array('I')
+        
+        for calls in call_map.values():
+            for call in calls:
+                if call not in index:
+                    index[call] = len(names)
+                    names.append(sys.intern(call))
+                targets.append(index[call])
+            offsets.append(len(targets))
+        
+        return CallGraph(names, defined, offsets, targets)
+    
+    def __getitem__(self, name):
+        i = self.index.get(name)
+        if i is None or i >= self.defined:
+            raise KeyError(name)
+        return [self.names[t] for t in self.callees(i)]
+    
+    def __iter__(self):
+        return iter(self.names[:self.defined])
+    
+    def __len__(self):
+        return self.defined
+    
+    def __contains__(self, name):
+        i = self.index.get(name)
+        return i is not None and i < self.defined
+    
+    # same names with every call flipped, built once on first use
+    def reverse(self):
+        if getattr(self, '_reverse', None) is None:
+            counts = [0] * (len(self.names) + 1)
+            for target in self.targets:
+                counts[target + 1] += 1
+            offsets = array('I', accumulate(counts))
+            targets = array('I', bytes(4 * len(self.targets)))
+            fill = list(offsets[:-1])
+            for caller in range(self.defined):
+                for target in self.callees(caller):
+                    targets[fill[target]] = caller
+                    fill[target] += 1
+            self._reverse = CallGraph(self.names, len(self.names), offsets, targets)
+            self._reverse.index = self.index
+        return self._reverse
+    
+    # callee ids of function id i (missing functions have none)
+    def callees(self, i):
+        if i >= self.defined:
+            return self.targets[:0]
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+    
+    @property
+    def edge_count(self):
+        return len(self.targets)
+    
+    def save(self, path):
+        names_blob = '\n'.join(self.names).encode('utf-8')
+        offsets, targets = array('I', self.offsets), array('I', self.targets)
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+            targets.byteswap()
+        
+        with open(path, 'wb') as f:
+            f.write(struct.pack('<4sIIIIQ', CallGraph.MAGIC, CallGraph.FORMAT, len(self.names),
+                                self.defined, len(targets), len(names_blob)))
+            f.write(names_blob)
+            f.write(offsets.tobytes())
+            f.write(targets.tobytes())
+    
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        
+        header = struct.calcsize('<4sIIIIQ')
+        magic, version, name_count, defined, edge_count, blob_size = struct.unpack_from('<4sIIIIQ', data)
+        if magic != CallGraph.MAGIC or version != CallGraph.FORMAT:
+            raise ValueError(f"{path} is not a call graph file (format {CallGraph.FORMAT})")
+        
+        pos = header + blob_size
+        names = data[header:pos].decode('utf-8').split('\n') if name_count else []
+        offsets, targets = array('I'), array('I')
+        offsets.frombytes(data[pos:pos + 4 * (defined + 1)])
+        targets.frombytes(data[pos + 4 * (defined + 1):pos + 4 * (defined + 1 + edge_count)])
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+            targets.byteswap()
+        
+        return CallGraph(names, defined, offsets, targets)
+
+class GraphTraversal:
+    """
+    explicit-stack walks over a CallGraph, so call chains of any depth are handled;
+    all walks only enter defined functions unless noted, and run in O(names + calls)
+    """
+    # depth-first preorder from each root in turn, callees in source order
+    @staticmethod
+    def preorder(graph, roots):
+        visited = bytearray(len(graph.names))
+        order = []
+        
+        for root in roots:
+            if visited[root] or root >= graph.defined:
+                continue
+            visited[root] = 1
+            order.append(root)
+            stack = [(root, graph.offsets[root])]
+            
+            while stack:
+                node, pos = stack[-1]
+                end = graph.offsets[node + 1]
+                while pos < end and (visited[graph.targets[pos]] or graph.targets[pos] >= graph.defined):
+                    pos += 1
+                if pos == end:
+                    stack.pop()
+                    continue
+                
+                stack[-1] = (node, pos + 1)
+                call = graph.targets[pos]
+                visited[call] = 1
+                order.append(call)
+                stack.append((call, graph.offsets[call]))
+        
+        return order
+    
+    # Tarjan's algorithm; components come out callees-first (reverse topological order)
+    @staticmethod
+    def strongly_connected_components(graph, roots=None):
+        index = [-1] * graph.defined
+        low = [0] * graph.defined
+        on_stack = bytearray(graph.defined)
+        component_stack = []
+        components = []
+        counter = 0
+        
+        for root in (range(graph.defined) if roots is None else roots):
+            if root >= graph.defined or index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            component_stack.append(root)
+            on_stack[root] = 1
+            stack = [(root, graph.offsets[root])]
+            
+            while stack:
+                node, pos = stack[-1]
+                if pos < graph.offsets[node + 1]:
+                    stack[-1] = (node, pos + 1)
+                    call = graph.targets[pos]
+                    if call >= graph.defined:
+                        continue
+                    if index[call] == -1:
+                        index[call] = low[call] = counter
+                        counter += 1
+                        component_stack.append(call)
+                        on_stack[call] = 1
+                        stack.append((call, graph.offsets[call]))
+                    elif on_stack[call]:
+                        low[node] = min(low[node], index[call])
+                    continue
+                
+                stack.pop()
+                if stack:
+                    parent = stack[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = component_stack.pop()
+                        on_stack[member] = 0
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component, key=index.__getitem__))
+        
+        return components
+    
+    # callers before callees, each strongly connected component kept together
+    @staticmethod
+    def condensed_order(graph, roots):
+        components = GraphTraversal.strongly_connected_components(graph, roots)
+        return [node for component in reversed(components) for node in component]
+    
+    # ids reachable from roots within depth calls (None: any depth), missing functions included
+    @staticmethod
+    def reachable(graph, roots, depth=None, reverse=False):
+        if reverse:
+            graph = graph.reverse()
+        seen = {root: 0 for root in roots}
+        frontier = list(seen)
+        level = 0
+        
+        while frontier and (depth is None or level < depth):
+            level += 1
+            next_frontier = []
+            for node in frontier:
+                for call in graph.callees(node):
+                    if call not in seen:
+                        seen[call] = level
+                        next_frontier.append(call)
+            frontier = next_frontier
+        
+        return seen
+    
+    # {name: distance} of everything func_name calls, directly or through up to depth calls
+    @staticmethod
+    def callees_of(graph, func_name, depth=1):
+        found = GraphTraversal.reachable(graph, [graph.index[func_name]], depth)
+        return {graph.names[node]: level for node, level in found.items() if level}
+    
+    # {name: distance} of everything that calls func_name, directly or through up to depth calls
+    @staticmethod
+    def callers_of(graph, func_name, depth=1):
+        found = GraphTraversal.reachable(graph, [graph.index[func_name]], depth, reverse=True)
+        return {graph.names[node]: level for node, level in found.items() if level}
+
 class CallGraphBuilder:
     """
     1. analyze function bodies to find function calls using CALL_PATTERNS
     2. create a map of which functions call which other functions
     3. build execution flow starting from entry point
-    4. use depth-first traversal to order functions by call sequence
+    4. order functions by call sequence (depth-first preorder) or by condensed topological order
     5. return: execution order, missing functions, and call relationships
     """
+    regexes = [re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in CALL_PATTERNS]
+
     @staticmethod
-    def build_call_graph(all_functions, start_func):
+    def build_call_graph(all_functions, start_func, call_lists=None, order='dfs'):
         call_map = {}
         missing_functions = set()
-        compiled_patterns = [re.compile(pattern, re.IGNORECASE | re.MULTILINE) for pattern in CALL_PATTERNS]
+        compiled_patterns = CallGraphBuilder.compile_patterns()
         
         for name, body in all_functions.items():
-            calls = set()
-            
-            for pattern in compiled_patterns:
-                for match in pattern.finditer(body):
-                    call_name = match.group(1)
-                    
-                    if CallGraphBuilder.is_valid_function_call(call_name, name, body, match.start()):
-                        calls.add(call_name)
-                        if call_name not in all_functions:
-                            missing_functions.add(call_name)
+            if call_lists and name in call_lists:
+                calls = call_lists[name]
+            else:
+                calls = CallGraphBuilder.extract_calls(name, body, compiled_patterns)
             
-            call_map[name] = list(calls)
+            missing_functions.update(call for call in calls if call not in all_functions)
+            call_map[name] = calls
         
-        flow = []
-        visited = set()
+        graph = CallGraph.from_call_map(call_map)
+        del call_map
         
-        def traverse(func_name, depth=0):
-            if func_name in visited or depth > 100 or func_name not in all_functions:
-                return
-            
-            visited.add(func_name)
-            flow.append(func_name)
+        roots = [graph.index[start_func]] if start_func and start_func in all_functions else []
+        roots.extend(range(graph.defined))
+        if order == 'scc':
+            nodes = GraphTraversal.condensed_order(graph, roots)
+        else:
+            nodes = GraphTraversal.preorder(graph, roots)
+        flow = [graph.names[node] for node in nodes]
+        
+        return flow, missing_functions, graph
+    
+    # like build_call_graph, but only functions reached from the roots (up to depth calls away) are analyzed;
+    # functions at the depth limit are kept without following their calls
+    @staticmethod
+    def build_reachable_graph(all_functions, roots, depth=None, call_lists=None, order='dfs'):
+        call_map = {}
+        missing_functions = set()
+        compiled_patterns = CallGraphBuilder.compile_patterns()
+        frontier = [root for root in dict.fromkeys(roots) if root in all_functions]
+        level = 0
+        
+        while frontier:
+            for name in frontier:
+                call_map[name] = []
+            if depth is not None and level >= depth:
+                break
             
-            for call in call_map.get(func_name, []):
-                traverse(call, depth + 1)
+            next_frontier = []
+            for name in frontier:
+                if call_lists and name in call_lists:
+                    calls = call_lists[name]
+                else:
+                    calls = CallGraphBuilder.extract_calls(name, all_functions[name], compiled_patterns)
+                call_map[name] = calls
+                
+                for call in calls:
+                    if call not in all_functions:
+                        missing_functions.add(call)
+                    elif call not in call_map:
+                        call_map[call] = []
+                        next_frontier.append(call)
+            frontier = next_frontier
+            level += 1
         
-        if start_func and start_func in all_functions:
-            traverse(start_func)
+        graph = CallGraph.from_call_map(call_map)
+        del call_map
         
-        for func_name in all_functions:
-            if func_name not in visited:
-                traverse(func_name)
+        root_ids = [graph.index[root] for root in dict.fromkeys(roots) if root in all_functions]
+        if order == 'scc':
+            nodes = GraphTraversal.condensed_order(graph, root_ids)
+        else:
+            nodes = GraphTraversal.preorder(graph, root_ids)
+        flow = [graph.names[node] for node in nodes]
         
-        return flow, missing_functions, call_map
+        return flow, missing_functions, graph
+    
+    @staticmethod
+    def compile_patterns():
+        return CallGraphBuilder.regexes
+    
+    # names called from one function body, in order of first appearance
+    @staticmethod
+    def extract_calls(name, body, compiled_patterns=None):
+        calls = {}
+        
+        for pattern in compiled_patterns or CallGraphBuilder.compile_patterns():
+            for match in pattern.finditer(body):
+                call_name = match.group(1)
+                
+                if CallGraphBuilder.is_valid_function_call(call_name, name, body, match.start()):
+                    if call_name not in calls or match.start(1) < calls[call_name]:
+                        calls[call_name] = match.start(1)
+        
+        return sorted(calls, key=calls.get)
     
     # verify the found pattern is function call
     @staticmethod
@@ -249,23 +1173,610 @@ class CallGraphBuilder:
         
         return not any(pattern in context for pattern in exclusion_patterns)
 
+class CallGraphIndex:
+    """
+    1. one sqlite file holds any number of samples, writing a sample again replaces its rows
+    2. functions (with flow position and library classification), edges and missing functions
+    3. edges are indexed on caller and on callee, so each hop of a query is one index lookup
+    4. queries: callers / callees up to a depth, reachable set, shortest call path
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS samples (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL, entry TEXT);
+        CREATE TABLE IF NOT EXISTS functions (sample INTEGER NOT NULL, id INTEGER NOT NULL, name TEXT NOT NULL,
+            missing INTEGER NOT NULL, flow_position INTEGER, classification TEXT, PRIMARY KEY (sample, id));
+        CREATE TABLE IF NOT EXISTS edges (sample INTEGER NOT NULL, caller INTEGER NOT NULL,
+            callee INTEGER NOT NULL, position INTEGER NOT NULL);
+        CREATE INDEX IF NOT EXISTS functions_name ON functions (sample, name);
+        CREATE INDEX IF NOT EXISTS edges_caller ON edges (sample, caller);
+        CREATE INDEX IF NOT EXISTS edges_callee ON edges (sample, callee);
+        CREATE VIEW IF NOT EXISTS missing_functions AS
+            SELECT sample, name, classification FROM functions WHERE missing = 1;
+        CREATE VIEW IF NOT EXISTS library AS
+            SELECT sample, name, classification FROM functions WHERE classification IS NOT NULL;
+    """
+    BATCH = 500
+    
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        self.db.executescript(CallGraphIndex.SCHEMA)
+    
+    def close(self):
+        self.db.close()
+    
+    def write_sample(self, sample, start_func, flow, call_map, matcher):
+        positions = {name: n for n, name in enumerate(flow)}
+        with self.db:
+            self.db.execute("DELETE FROM edges WHERE sample IN (SELECT id FROM samples WHERE name = ?)", (sample,))
+            self.db.execute("DELETE FROM functions WHERE sample IN (SELECT id FROM samples WHERE name = ?)", (sample,))
+            self.db.execute("DELETE FROM samples WHERE name = ?", (sample,))
+            sample_id = self.db.execute("INSERT INTO samples (name, entry) VALUES (?, ?)", (sample, start_func)).lastrowid
+            
+            self.db.executemany("INSERT INTO functions VALUES (?, ?, ?, ?, ?, ?)",
+                                ((sample_id, i, name, int(i >= call_map.defined), positions.get(name), matcher.classify(name))
+                                 for i, name in enumerate(call_map.names)))
+            self.db.executemany("INSERT INTO edges VALUES (?, ?, ?, ?)",
+                                ((sample_id, caller, callee, position)
+                                 for caller in range(call_map.defined)
+                                 for position, callee in enumerate(call_map.callees(caller))))
+        return sample_id
+    
+    # id of the named sample, or of the only sample when no name is given
+    def sample_id(self, sample=None):
+        rows = self.db.execute("SELECT id, name FROM samples").fetchall()
+        if sample is None and len(rows) == 1:
+            return rows[0][0]
+        for sample_id, name in rows:
+            if name == sample:
+                return sample_id
+        raise LookupError(f"choose a sample with --sample: {', '.join(sorted(name for _, name in rows))}")
+    
+    def function_id(self, sample_id, func_name):
+        row = self.db.execute("SELECT id FROM functions WHERE sample = ? AND name = ?", (sample_id, func_name)).fetchone()
+        if row is None:
+            raise LookupError(f"function '{func_name}' is not in this sample")
+        return row[0]
+    
+    def names(self, sample_id, ids):
+        ids, names = list(ids), {}
+        for i in range(0, len(ids), CallGraphIndex.BATCH):
+            chunk = ids[i:i + CallGraphIndex.BATCH]
+            query = f"SELECT id, name FROM functions WHERE sample = ? AND id IN ({', '.join('?' * len(chunk))})"
+            names.update(self.db.execute(query, [sample_id, *chunk]))
+        return names
+    
+    # {node: [neighbour, ...]} for a whole frontier: callees in call order, callers by id
+    def neighbours(self, sample_id, nodes, reverse=False):
+        near, far, order = ('caller', 'callee', 'caller') if reverse else ('callee', 'caller', 'position')
+        found = {}
+        for i in range(0, len(nodes), CallGraphIndex.BATCH):
+            chunk = nodes[i:i + CallGraphIndex.BATCH]
+            query = (f"SELECT {far}, {near} FROM edges WHERE sample = ? AND {far} IN ({', '.join('?' * len(chunk))}) "
+                     f"ORDER BY {far}, {order}")
+            for node, neighbour in self.db.execute(query, [sample_id, *chunk]):
+                found.setdefault(node, []).append(neighbour)
+        return found
+    
+    # {name: distance} of everything func_name reaches (is reached from, with reverse), func_name itself excluded.
+    # Without depth one recursive query walks the set and distances are None; with depth the walk goes level
+    # by level, one batched lookup per level, and every function is expanded once at its smallest distance
+    def reachable(self, sample_id, func_name, depth=None, reverse=False):
+        start = self.function_id(sample_id, func_name)
+        if depth is None:
+            near, far = ('caller', 'callee') if reverse else ('callee', 'caller')
+            query = f"""
+                WITH RECURSIVE walk(id) AS (
+                    SELECT :start
+                    UNION
+                    SELECT edges.{near} FROM walk JOIN edges ON edges.sample = :sample AND edges.{far} = walk.id)
+                SELECT functions.name, NULL FROM walk JOIN functions ON functions.sample = :sample AND functions.id = walk.id
+                WHERE walk.id != :start"""
+            return dict(self.db.execute(query, {'start': start, 'sample': sample_id}))
+        
+        seen = {start: 0}
+        frontier = [start]
+        for level in range(1, depth + 1):
+            following = self.neighbours(sample_id, frontier, reverse)
+            next_frontier = []
+            for node in frontier:
+                for neighbour in following.get(node, ()):
+                    if neighbour not in seen:
+                        seen[neighbour] = level
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+            if not frontier:
+                break
+        del seen[start]
+        names = self.names(sample_id, seen)
+        return {names[node]: level for node, level in seen.items()}
+    
+    # fewest calls from source to target, as a list of names (None if unreachable)
+    def shortest_path(self, sample_id, source, target):
+        start, goal = self.function_id(sample_id, source), self.function_id(sample_id, target)
+        parents = {start: None}
+        frontier = [start]
+        while frontier and goal not in parents:
+            following = self.neighbours(sample_id, frontier)
+            next_frontier = []
+            for node in frontier:
+                for callee in following.get(node, ()):
+                    if callee not in parents:
+                        parents[callee] = node
+                        next_frontier.append(callee)
+            frontier = next_frontier
+        if goal not in parents:
+            return None
+        
+        path = []
+        node = goal
+        while node is not None:
+            path.append(node)
+            node = parents[node]
+        names = self.names(sample_id, path)
+        return [names[node] for node in reversed(path)]
+
+class BodyNormalizer:
+    """
+    1. IDA dummy names (qword_XXXX, sub_XXXX, loc_XXXX, retval_XXXX...) lose their address
+    2. locals v<n> and arguments a<n> are renumbered in order of first appearance
+    3. hex constants of 5+ digits (addresses) become 0xADDR, runs of spaces/tabs become one space
+    4. the function's own name becomes FUNC, so a renamed copy of a function keeps its digest
+    """
+    pattern = re.compile(r'\b(?:(qword|dword|word|byte|xmmword|ymmword|unk|off|sub|loc|locret|stru|asc|flt|dbl|jpt|retval)_[0-9A-Fa-f]+'
+                         r'|([va])(\d+)|0x[0-9A-Fa-f]{5,})\b')
+    spaces = re.compile(r'[ \t]+')
+    
+    @staticmethod
+    def normalize(body, name=None):
+        if name:
+            body = re.sub(rf'(?<!\w){re.escape(name)}(?!\w)', 'FUNC', body)
+        renamed, counters = {}, {'v': 0, 'a': 0}
+        
+        def replace(match):
+            if match.group(1):
+                return match.group(1) + '_X'
+            kind = match.group(2)
+            if kind:
+                if match.group(0) not in renamed:
+                    counters[kind] += 1
+                    renamed[match.group(0)] = f"{kind}{counters[kind]}"
+                return renamed[match.group(0)]
+            return '0xADDR'
+        
+        body = BodyNormalizer.pattern.sub(replace, body)
+        return '\n'.join(line for line in (BodyNormalizer.spaces.sub(' ', line).strip() for line in body.splitlines()) if line)
+    
+    @staticmethod
+    def digest(body, name=None):
+        return hashlib.sha256(BodyNormalizer.normalize(body, name).encode('utf-8')).hexdigest()
+
+class FunctionSubset(Mapping):
+    # read-only view of some functions of a dict or FunctionStore, bodies are still read on demand
+    def __init__(self, functions, names):
+        self.functions = functions
+        self.names = [name for name in names if name in functions]
+        self.members = set(self.names)
+    
+    def __getitem__(self, name):
+        if name not in self.members:
+            raise KeyError(name)
+        return self.functions[name]
+    
+    def __iter__(self):
+        return iter(self.names)
+    
+    def __len__(self):
+        return len(self.names)
+    
+    def __contains__(self, name):
+        return name in self.members
+
+class FunctionDedupStore:
+    """
+    1. one sqlite file shared by all samples, every distinct normalized body is stored once (zlib)
+    2. a body first stored by another sample is "known": organized_code.txt gets a reference instead of the body
+    3. call lists are kept per exact name + body (and pattern version), so known functions skip call extraction
+    4. names of one body across samples give classification hints for new names in all_functions.txt
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS bodies (digest TEXT PRIMARY KEY, sample TEXT NOT NULL, name TEXT NOT NULL,
+            size INTEGER NOT NULL, body BLOB NOT NULL);
+        CREATE TABLE IF NOT EXISTS names (digest TEXT NOT NULL, name TEXT NOT NULL, PRIMARY KEY (digest, name));
+        CREATE TABLE IF NOT EXISTS calls (key TEXT PRIMARY KEY, calls TEXT NOT NULL);
+    """
+    
+    def __init__(self, path):
+        # several batch workers may share one store, writers wait for each other
+        self.db = sqlite3.connect(path, timeout=300)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(FunctionDedupStore.SCHEMA)
+        self.version = ExtractionCache.pattern_version()
+        self.digests = {}
+    
+    def close(self):
+        self.db.close()
+    
+    # store new bodies, return {name: (digest, first sample, first name)} for bodies known from other samples
+    def register(self, sample, all_functions):
+        known = {}
+        self.digests = {name: BodyNormalizer.digest(body, name) for name, body in all_functions.items()}
+        # immediate: another sample may be adding the same body right now
+        self.db.execute("BEGIN IMMEDIATE")
+        with self.db:
+            for name, digest in self.digests.items():
+                row = self.db.execute("SELECT sample, name FROM bodies WHERE digest = ?", (digest,)).fetchone()
+                if row is None:
+                    body = all_functions[name]
+                    self.db.execute("INSERT INTO bodies VALUES (?, ?, ?, ?, ?)",
+                                    (digest, sample, name, len(body), zlib.compress(body.encode('utf-8'))))
+                elif row[0] != sample:
+                    known[name] = (digest, row[0], row[1])
+            self.db.executemany("INSERT OR IGNORE INTO names VALUES (?, ?)", ((digest, name) for name, digest in self.digests.items()))
+        return known
+    
+    def body(self, digest):
+        row = self.db.execute("SELECT body FROM bodies WHERE digest = ?", (digest,)).fetchone()
+        return zlib.decompress(row[0]).decode('utf-8') if row else None
+    
+    def call_key(self, name, body):
+        return hashlib.sha256(f"{self.version}\0{name}\0{body}".encode('utf-8')).hexdigest()
+    
+    # stored call lists for build_call_graph(call_lists=...), plus the keys to store the missing ones under
+    def call_lists(self, all_functions):
+        keys = {name: self.call_key(name, body) for name, body in all_functions.items()}
+        call_lists = {}
+        for name, key in keys.items():
+            row = self.db.execute("SELECT calls FROM calls WHERE key = ?", (key,)).fetchone()
+            if row:
+                call_lists[name] = json.loads(row[0])
+        return keys, call_lists
+    
+    def store_calls(self, keys, call_lists, call_map):
+        with self.db:
+            self.db.executemany("INSERT OR IGNORE INTO calls VALUES (?, ?)",
+                                ((key, json.dumps(call_map[name])) for name, key in keys.items() if name not in call_lists))
+    
+    # {new name: (classification, classified name with the same body)}
+    def hints(self, new_names, matcher):
+        hints = {}
+        for name in sorted(new_names):
+            digest = self.digests.get(name)
+            if digest is None:
+                continue
+            for (other,) in self.db.execute("SELECT name FROM names WHERE digest = ? AND name != ? ORDER BY name", (digest, name)):
+                classification = matcher.classify(other)
+                if classification:
+                    hints[name] = (classification, other)
+                    break
+        return hints
+
+class SimilarityIndex:
+    """
+    1. shingles: every run of 5 tokens of the normalized body (BodyNormalizer), crc32 hashed
+    2. one-permutation minhash: each shingle hash is mixed once and lands in one of num_perm bins,
+       a bin keeps its smallest value and empty bins borrow from the next filled one (densification)
+    3. the signature is cut into bands, each band hashes to one bucket row in sqlite (indexed on band + key)
+    4. adding a sample only inserts rows; a query reads its own band buckets, keeps the candidates sharing
+       the most bands and ranks them by the share of equal signature values (estimated Jaccard similarity)
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS functions (id INTEGER PRIMARY KEY, sample TEXT NOT NULL, name TEXT NOT NULL,
+            signature BLOB NOT NULL, UNIQUE (sample, name));
+        CREATE TABLE IF NOT EXISTS buckets (band INTEGER NOT NULL, key INTEGER NOT NULL, function INTEGER NOT NULL);
+        CREATE INDEX IF NOT EXISTS buckets_key ON buckets (band, key);
+        CREATE INDEX IF NOT EXISTS buckets_function ON buckets (function);
+        CREATE INDEX IF NOT EXISTS functions_name ON functions (name);
+    """
+    SHINGLE = 5
+    MIX = 0x9E3779B97F4A7C15
+    EMPTY = 0xFFFFFFFF
+    BUCKET_LIMIT = 5000
+    CANDIDATES = 500
+    tokens = re.compile(r'\w+|[^\w\s]')
+    
+    def __init__(self, path, num_perm=128, bands=32):
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SimilarityIndex.SCHEMA)
+        stored = dict(self.db.execute("SELECT key, value FROM meta"))
+        if stored:
+            num_perm, bands = int(stored['num_perm']), int(stored['bands'])
+        else:
+            with self.db:
+                self.db.executemany("INSERT INTO meta VALUES (?, ?)", [('num_perm', str(num_perm)), ('bands', str(bands))])
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.num_perm, self.bands, self.rows = num_perm, bands, num_perm // bands
+    
+    def close(self):
+        self.db.close()
+    
+    @staticmethod
+    def shingles(body, name=None):
+        tokens = SimilarityIndex.tokens.findall(BodyNormalizer.normalize(body, name))
+        size = SimilarityIndex.SHINGLE
+        return {zlib.crc32(' '.join(tokens[i:i + size]).encode('utf-8')) for i in range(max(1, len(tokens) - size + 1))}
+    
+    # one pass over the shingles instead of one per permutation
+    def signature(self, shingles):
+        bins = self.num_perm
+        values = [SimilarityIndex.EMPTY] * bins
+        for shingle in shingles:
+            mixed = (shingle * SimilarityIndex.MIX) & 0xFFFFFFFFFFFFFFFF
+            slot, value = mixed % bins, (mixed // bins) & 0xFFFFFFFF
+            if value < values[slot]:
+                values[slot] = value
+        
+        filled = [slot for slot in range(bins) if values[slot] != SimilarityIndex.EMPTY]
+        if filled and len(filled) < bins:
+            signature = values[:]
+            for slot in range(bins):
+                if values[slot] == SimilarityIndex.EMPTY:
+                    source = filled[bisect_left(filled, slot) % len(filled)]
+                    # borrowed values get the distance mixed in so they only match the same borrow
+                    signature[slot] = (values[source] + (source - slot) % bins * 0x9E3779B1) & 0xFFFFFFFF
+            values = signature
+        return array('I', values)
+    
+    def band_keys(self, signature):
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            yield band, int.from_bytes(hashlib.blake2b(chunk, digest_size=8).digest(), 'little', signed=True)
+    
+    # adding a sample again replaces its functions
+    def add(self, sample, all_functions):
+        with self.db:
+            self.db.execute("DELETE FROM buckets WHERE function IN (SELECT id FROM functions WHERE sample = ?)", (sample,))
+            self.db.execute("DELETE FROM functions WHERE sample = ?", (sample,))
+            
+            for name, body in all_functions.items():
+                signature = self.signature(SimilarityIndex.shingles(body, name))
+                function_id = self.db.execute("INSERT INTO functions (sample, name, signature) VALUES (?, ?, ?)",
+                                              (sample, name, signature.tobytes())).lastrowid
+                self.db.executemany("INSERT INTO buckets VALUES (?, ?, ?)",
+                                    ((band, key, function_id) for band, key in self.band_keys(signature)))
+        return len(all_functions)
+    
+    # (sample, signature) of an indexed function, the first sample holding it unless one is given
+    def stored_signature(self, name, sample=None):
+        query, params = "SELECT sample, signature FROM functions WHERE name = ?", [name]
+        if sample:
+            query, params = query + " AND sample = ?", params + [sample]
+        row = self.db.execute(query, params).fetchone()
+        if row is None:
+            raise LookupError(f"function '{name}' is not in the index" + (f" for sample '{sample}'" if sample else ""))
+        return row[0], array('I', row[1])
+    
+    # [(similarity, sample, name)], best first
+    def query(self, signature, k=10, exclude=None):
+        # band collisions are counted in sqlite and only the functions sharing the most bands get their
+        # signature read (one query), each bucket still capped at BUCKET_LIMIT rows
+        keys = list(self.band_keys(signature))
+        bucket = "SELECT * FROM (SELECT function FROM buckets WHERE band = ? AND key = ? LIMIT ?)"
+        query = f"""
+            SELECT functions.sample, functions.name, functions.signature
+            FROM (SELECT function, COUNT(*) AS hits FROM ({' UNION ALL '.join([bucket] * len(keys))})
+                  GROUP BY function ORDER BY hits DESC, function LIMIT ?) AS top
+            JOIN functions ON functions.id = top.function"""
+        params = [value for band, key in keys for value in (band, key, SimilarityIndex.BUCKET_LIMIT)]
+        params.append(max(SimilarityIndex.CANDIDATES, k) + 1)
+        
+        scored = []
+        for sample, name, stored in self.db.execute(query, params):
+            if (sample, name) == exclude:
+                continue
+            other = array('I', stored)
+            scored.append((sum(1 for x, y in zip(signature, other) if x == y) / self.num_perm, sample, name))
+        scored.sort(key=lambda item: (-item[0], item[1], item[2]))
+        return scored[:k]
+
+class CallGraphDiff:
+    """
+    1. every function gets a merkle hash: its normalized body digest plus the names and hashes of its callees
+    2. hashes are computed callees-first over strongly connected components, a cycle is hashed as one unit
+    3. the diff walks both graphs top-down from their uncalled components and stops wherever the two
+       hashes are equal, since everything below such a function is identical in both samples
+    4. return: added, removed and modified (body changed) functions and added/removed calls
+    """
+    @staticmethod
+    def merkle_hashes(all_functions, graph):
+        local = {name: BodyNormalizer.digest(all_functions[name], name) for name in graph}
+        merkle = {}
+        for component in GraphTraversal.strongly_connected_components(graph):
+            members = sorted(graph.names[node] for node in component)
+            inside = set(members)
+            digest = hashlib.sha256()
+            for name in members:
+                digest.update(f"{name}\0{local[name]}\0".encode('utf-8'))
+                for call in graph[name]:
+                    if call in inside:
+                        digest.update(f"{call}\0cycle\0".encode('utf-8'))
+                    else:
+                        digest.update(f"{call}\0{merkle.get(call, 'missing')}\0".encode('utf-8'))
+            component_hash = digest.hexdigest()
+            for name in members:
+                merkle[name] = component_hash if len(members) == 1 else hashlib.sha256(f"{component_hash}\0{name}".encode('utf-8')).hexdigest()
+        return local, merkle
+
+    # members of components no other component calls
+    @staticmethod
+    def sources(graph):
+        components = GraphTraversal.strongly_connected_components(graph)
+        component_of = [0] * graph.defined
+        for n, component in enumerate(components):
+            for node in component:
+                component_of[node] = n
+        called = bytearray(len(components))
+        for node in range(graph.defined):
+            for call in graph.callees(node):
+                if call < graph.defined and component_of[call] != component_of[node]:
+                    called[component_of[call]] = 1
+        return [graph.names[node] for n, component in enumerate(components) if not called[n] for node in component]
+
+    @staticmethod
+    def diff(old_functions, old_graph, new_functions, new_graph):
+        old_local, old_merkle = CallGraphDiff.merkle_hashes(old_functions, old_graph)
+        new_local, new_merkle = CallGraphDiff.merkle_hashes(new_functions, new_graph)
+        result = {'added': [], 'removed': [], 'modified': [], 'calls_added': [], 'calls_removed': [], 'unchanged_subtrees': 0}
+        
+        stack = list(reversed(CallGraphDiff.sources(new_graph) + CallGraphDiff.sources(old_graph)))
+        visited = set()
+        while stack:
+            name = stack.pop()
+            if name in visited:
+                continue
+            visited.add(name)
+            in_old, in_new = name in old_merkle, name in new_merkle
+            if in_old and in_new and old_merkle[name] == new_merkle[name]:
+                result['unchanged_subtrees'] += 1
+                continue
+            
+            if not in_old:
+                result['added'].append(name)
+            elif not in_new:
+                result['removed'].append(name)
+            elif old_local[name] != new_local[name]:
+                result['modified'].append(name)
+            
+            old_calls = old_graph[name] if in_old else []
+            new_calls = new_graph[name] if in_new else []
+            old_set, new_set = set(old_calls), set(new_calls)
+            result['calls_added'].extend((name, call) for call in new_calls if call not in old_set)
+            result['calls_removed'].extend((name, call) for call in old_calls if call not in new_set)
+            stack.extend(call for call in reversed(old_calls + new_calls)
+                         if call not in visited and (call in old_merkle or call in new_merkle))
+        
+        for key in ('added', 'removed', 'modified', 'calls_added', 'calls_removed'):
+            result[key].sort()
+        return result
+
 class FunctionFilter:
     # apply non-function filter pattern (pseudo_C_analyzer_lib.txt)
     @staticmethod
     def filter_functions(all_functions, missing_functions, lib_functions, lib_non_functions):
+        matcher = LibraryManager.compile_library(lib_functions, lib_non_functions)
         all_names = set(all_functions.keys()) | missing_functions
-        classified = {name for name in all_names 
-                     if (LibraryManager.matches_pattern(name, lib_functions) or 
-                         LibraryManager.matches_pattern(name, lib_non_functions))}
-        return all_names - classified
+        return {name for name in all_names if matcher.classify(name) is None}
+
+class CountingRegex:
+    # compiled pattern that counts its search/finditer calls into a shared Counter
+    def __init__(self, regex, label, counts):
+        self.regex = regex
+        self.label = label
+        self.counts = counts
+    
+    def search(self, *args):
+        self.counts[self.label] += 1
+        return self.regex.search(*args)
+    
+    def finditer(self, *args):
+        self.counts[self.label] += 1
+        return self.regex.finditer(*args)
+
+class Profiler:
+    """
+    1. stage(name) records wall time, cpu time and peak traced memory; a stage can be entered many times
+    2. extract_file times reading and extraction of every file separately
+    3. instrument() swaps the compiled FUNCTION_PATTERNS/CALL_PATTERNS for counting wrappers
+    4. report() prints a table, to_json() keeps the same numbers for later comparison
+    with --jobs, per-file numbers and regex counts only cover work done in the main process
+    """
+    def __init__(self, top=10):
+        self.top = top
+        self.stages = {}
+        self.files = []
+        self.largest = []
+        self.regex_counts = Counter()
+        self.started = time.perf_counter()
+        self.saved_regexes = None
+    
+    def instrument(self):
+        self.saved_regexes = (FunctionExtractor.regexes, CallGraphBuilder.regexes)
+        FunctionExtractor.regexes = [CountingRegex(regex, f"FUNCTION_PATTERNS[{n}]", self.regex_counts)
+                                     for n, regex in enumerate(FunctionExtractor.regexes)]
+        CallGraphBuilder.regexes = [CountingRegex(regex, f"CALL_PATTERNS[{n}]", self.regex_counts)
+                                    for n, regex in enumerate(CallGraphBuilder.regexes)]
+        tracemalloc.start()
+    
+    def restore(self):
+        if self.saved_regexes:
+            FunctionExtractor.regexes, CallGraphBuilder.regexes = self.saved_regexes
+        tracemalloc.stop()
+    
+    @contextmanager
+    def stage(self, name):
+        tracemalloc.reset_peak()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            entry = self.stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'peak_mb': 0.0, 'calls': 0})
+            entry['wall'] += time.perf_counter() - wall
+            entry['cpu'] += time.process_time() - cpu
+            entry['peak_mb'] = max(entry['peak_mb'], tracemalloc.get_traced_memory()[1] / 1024 / 1024)
+            entry['calls'] += 1
+    
+    def extract_file(self, path, legacy=False, mapped=False):
+        start = time.perf_counter()
+        if mapped:
+            with self.stage('extraction'):
+                functions = FunctionExtractor.extract_mapped(path)
+        else:
+            with self.stage('file reading'):
+                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                    content = f.read()
+            with self.stage('extraction'):
+                functions = FunctionExtractor.extract_functions(content, legacy)
+            del content
+        self.files.append({'file': str(path), 'seconds': time.perf_counter() - start,
+                           'bytes': Path(path).stat().st_size, 'functions': len(functions)})
+        return functions
+    
+    def record_functions(self, all_functions):
+        if isinstance(all_functions, FunctionStore):
+            sizes = ((name, len(entry) if isinstance(entry, str) else entry[3] - entry[2])
+                     for name, entry in all_functions.entries.items())
+        else:
+            sizes = ((name, len(body)) for name, body in all_functions.items())
+        self.largest = [{'function': name, 'size': size} for name, size in sorted(sizes, key=lambda item: -item[1])[:self.top]]
+    
+    def to_json(self):
+        return {
+            'total_wall': time.perf_counter() - self.started,
+            'max_rss_mb': FileManager.max_rss_mb(),
+            'stages': self.stages,
+            'regex_invocations': dict(sorted(self.regex_counts.items())),
+            'slowest_files': sorted(self.files, key=lambda entry: -entry['seconds'])[:self.top],
+            'largest_functions': self.largest
+        }
+    
+    def report(self):
+        data = self.to_json()
+        lines = [f"{'stage':<24}{'wall s':>10}{'cpu s':>10}{'peak MB':>10}", "-" * 54]
+        for name, entry in data['stages'].items():
+            lines.append(f"{name:<24}{entry['wall']:>10.3f}{entry['cpu']:>10.3f}{entry['peak_mb']:>10.1f}")
+        lines.append(f"{'total':<24}{data['total_wall']:>10.3f}")
+        if data['max_rss_mb']:
+            lines.append(f"max RSS: {data['max_rss_mb']:.1f} MB (peaks above are Python allocations traced per stage)")
+        
+        lines.extend(["", "regex invocations", "-" * 54])
+        lines.extend(f"{label:<30}{count:>12}" for label, count in data['regex_invocations'].items())
+        
+        if data['slowest_files']:
+            lines.extend(["", f"slowest files (top {self.top})", "-" * 54])
+            lines.extend(f"{entry['seconds']:>8.3f}s {entry['bytes'] / 1024:>10.0f} KB  {entry['file']}"
+                         for entry in data['slowest_files'])
+        
+        lines.extend(["", f"largest functions (top {self.top})", "-" * 54])
+        lines.extend(f"{entry['size']:>10}  {entry['function']}" for entry in data['largest_functions'])
+        return '\n'.join(lines)
 
 class FileManager:
     # create all_functions.txt
     @staticmethod
-    def write_all_func_file(all_functions, missing_functions, lib_functions, lib_non_functions):
+    def write_all_func_file(all_functions, missing_functions, lib_functions, lib_non_functions, output_dir='.', hints=None):
         new_names = FunctionFilter.filter_functions(all_functions, missing_functions, lib_functions, lib_non_functions)
         
-        with open("all_functions.txt", "w", encoding='utf-8') as f:
+        with open(Path(output_dir) / "all_functions.txt", "w", encoding='utf-8') as f:
             f.write("=== NEW FUNCTIONS TO CLASSIFY ===\n"
                    "(add these to pseudo_C_analyzer_lib.txt under FUNCTIONS or NON-FUNCTIONS)\n")
             
@@ -285,42 +1796,157 @@ class FileManager:
                     f.write('\n'.join(cleaned_missing) + '\n')
             else:
                 f.write("all functions already classified in pseudo_C_analyzer_lib.txt\n")
+            
+            if hints:
+                f.write("\n=== CLASSIFICATION HINTS ===\n"
+                        "(same normalized body as an already classified function)\n")
+                f.write(''.join(f"{clean_function_name(name)}\t{classification}\t{clean_function_name(other)}\n"
+                                for name, (classification, other) in hints.items()))
         
         return len(new_names)
 
-    # create organized_code.txt, flow_chart.txt, missing_functions.txt
+    # create organized_code.txt, flow_chart.txt (optionally compressed), missing_functions.txt
     @staticmethod
-    def write_output_files(flow, all_functions, call_map, missing_functions, lib_functions, lib_non_functions):
+    def write_output_files(flow, all_functions, call_map, missing_functions, lib_functions, lib_non_functions, compression=None,
+                           profiler=None, output_dir='.', known=None):
         filtered_names = FunctionFilter.filter_functions(all_functions, missing_functions,lib_functions, lib_non_functions)
-        functions_for_output = {name: all_functions[name] for name in filtered_names if name in all_functions}
         
-        with open("organized_code.txt", "w", encoding='utf-8') as f:
-            f.write(f"=== ORGANIZED CODE ===\n"
-                   f"total functions included: {len(functions_for_output)}\n\n"
-                   f"=== FUNCTIONS IN EXECUTION ORDER ===\n\n")
-            
-            for func_name in flow:
-                if func_name in functions_for_output:
-                    display_name = clean_function_name(func_name)
-                    f.write(f"// function name: {display_name}\n\n"
-                            f"{functions_for_output[func_name]}\n\n{'='*50}\n\n")
-
-        with open("flow_chart.txt", "w", encoding='utf-8') as f:
-            f.write("=== FUNCTION CALL GRAPH ===\n")
-            for func_name in flow:
-                if func_name in filtered_names and func_name in call_map:
-                    for call in call_map[func_name]:
-                        if call in filtered_names:
-                            f.write(f"{func_name} -> {call}\n")
+        with profiler.stage('organized_code.txt') if profiler else nullcontext():
+            spans = {}
+            with FileManager.open_output("organized_code.txt", compression, output_dir) as f:
+                f.writelines(FileManager.organized_code_chunks(flow, all_functions, filtered_names, known, spans))
+            FileManager.write_code_index(spans, call_map, filtered_names, compression, output_dir)
+
+        with profiler.stage('flow_chart.txt') if profiler else nullcontext():
+            with FileManager.open_output("flow_chart.txt", compression, output_dir) as f:
+                f.writelines(FileManager.flow_chart_lines(flow, call_map, filtered_names))
 
         filtered_missing = filtered_names & missing_functions
-        with open("missing_functions.txt", "w", encoding='utf-8') as f:
+        with profiler.stage('missing_functions.txt') if profiler else nullcontext(), \
+                open(Path(output_dir) / "missing_functions.txt", "w", encoding='utf-8') as f:
             f.write(f"=== MISSING FUNCTIONS ({len(filtered_missing)}) ===\n")
             if filtered_missing:
                 f.write('\n'.join(sorted(filtered_missing)))
             else:
                 f.write("All functions found!\n")
 
+    # organized_code.txt piece by piece, bodies are pulled from all_functions one at a time
+    # known bodies (--dedup) are replaced by a reference into the shared store
+    # spans (if given) collects {name: (byte offset, byte length)} of every body as written
+    @staticmethod
+    def organized_code_chunks(flow, all_functions, filtered_names, known=None, spans=None):
+        included = sum(1 for name in filtered_names if name in all_functions)
+        header = (f"=== ORGANIZED CODE ===\n"
+                  f"total functions included: {included}\n\n"
+                  f"=== FUNCTIONS IN EXECUTION ORDER ===\n\n")
+        separator = f"\n\n{'='*50}\n\n"
+        yield header
+        offset = FileManager.byte_size(header) if spans is not None else 0
+        
+        for func_name in flow:
+            if func_name in filtered_names and func_name in all_functions:
+                title = f"// function name: {clean_function_name(func_name)}\n\n"
+                if known and func_name in known:
+                    digest, sample, name = known[func_name]
+                    body = f"// known body {digest} (first seen in sample '{sample}' as {clean_function_name(name)})"
+                else:
+                    body = all_functions[func_name]
+                yield title
+                yield body
+                yield separator
+                
+                if spans is not None:
+                    start = offset + FileManager.byte_size(title)
+                    length = FileManager.byte_size(body)
+                    spans[func_name] = (start, length)
+                    offset = start + length + FileManager.byte_size(separator)
+    
+    # bytes a text chunk takes in an output file (text mode writes os.linesep for every newline)
+    @staticmethod
+    def byte_size(text):
+        size = len(text) if text.isascii() else len(text.encode('utf-8'))
+        return size + (len(os.linesep) - 1) * text.count('\n')
+    
+    # organized_code.txt.idx: where each body starts, how long it is, its execution position and its calls
+    @staticmethod
+    def write_code_index(spans, call_map, filtered_names, compression=None, output_dir='.'):
+        callers = call_map.reverse()
+        functions = {}
+        for position, (name, (offset, length)) in enumerate(spans.items()):
+            i = call_map.index[name]
+            functions[name] = {
+                'offset': offset, 'length': length, 'position': position,
+                'callers': [call_map.names[c] for c in callers.callees(i) if call_map.names[c] in filtered_names],
+                'callees': [call for call in call_map[name] if call in filtered_names] if name in call_map else []
+            }
+        code_file = FileManager.output_name("organized_code.txt", compression)
+        with open(Path(output_dir) / (code_file + ".idx"), "w", encoding='utf-8') as f:
+            json.dump({'file': code_file, 'functions': functions}, f)
+
+    @staticmethod
+    def flow_chart_lines(flow, call_map, filtered_names):
+        yield "=== FUNCTION CALL GRAPH ===\n"
+        for func_name in flow:
+            if func_name in filtered_names and func_name in call_map:
+                for call in call_map[func_name]:
+                    if call in filtered_names:
+                        yield f"{func_name} -> {call}\n"
+
+    @staticmethod
+    def output_name(name, compression=None):
+        return name + OUTPUT_SUFFIXES[compression]
+
+    # buffered text stream for an output file, compressed ones get a .gz / .zst suffix
+    @staticmethod
+    def open_output(name, compression=None, output_dir='.'):
+        path = Path(output_dir) / FileManager.output_name(name, compression)
+        if compression == 'gzip':
+            return gzip.open(path, 'wt', encoding='utf-8')
+        if compression == 'zstd':
+            return FileManager.zstd_module().open(path, 'wt', encoding='utf-8')
+        return open(path, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER)
+
+    # zstandard is optional, only needed for --compress zstd
+    @staticmethod
+    def zstd_module():
+        try:
+            import zstandard
+        except ImportError:
+            print("zstd output needs the zstandard package (pip install zstandard)", file=sys.stderr)
+            sys.exit(1)
+        return zstandard
+
+    # one function body out of organized_code.txt through its .idx sidecar, without reading the rest
+    @staticmethod
+    def read_indexed_body(index_path, func_name):
+        index_path = Path(index_path)
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        functions = index['functions']
+        if func_name not in functions:
+            cleaned = [name for name in functions if clean_function_name(name) == func_name]
+            if not cleaned:
+                raise LookupError(f"function '{func_name}' is not in {index_path}")
+            func_name = cleaned[0]
+        
+        entry = functions[func_name]
+        code_path = index_path.parent / index['file']
+        opener = gzip.open if code_path.suffix == '.gz' else FileManager.zstd_module().open if code_path.suffix == '.zst' else open
+        with opener(code_path, 'rb') as f:
+            f.seek(entry['offset'])
+            body = f.read(entry['length']).decode('utf-8')
+        return func_name, entry, body.replace(os.linesep, '\n') if os.linesep != '\n' else body
+
+    # peak resident memory of this process, None where the resource module is missing (Windows)
+    @staticmethod
+    def max_rss_mb():
+        try:
+            import resource
+        except ImportError:
+            return None
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
     # delete previously created files
     @staticmethod
     def delete_files(files):
@@ -330,14 +1956,363 @@ class FileManager:
             except (FileNotFoundError, OSError):
                 continue
 
-def main():
-    if len(sys.argv) < 2:
-        print("usage: python analyzer.py <directory>")
+class BatchAnalyzer:
+    """
+    1. samples come from the command line and/or a manifest (one IDA_Files directory per line, # comments)
+    2. the library is read once and handed to every worker when the pool starts
+    3. each sample is analyzed in its own process and writes to <output>/<sample>/
+    4. return: one summary per sample in input order, failed samples keep their error
+    """
+    OUTPUTS = (["missing_functions.txt", "all_functions.txt"] +
+               [name + suffix for name in ("organized_code.txt", "flow_chart.txt") for suffix in OUTPUT_SUFFIXES.values()] +
+               ["organized_code.txt" + suffix + ".idx" for suffix in OUTPUT_SUFFIXES.values()])
+    library = (set(), set())
+
+    @staticmethod
+    def read_manifest(manifest):
+        base = Path(manifest).parent
+        with open(manifest, 'r', encoding='utf-8') as f:
+            lines = [line.strip() for line in f]
+        return [base / line for line in lines if line and not line.startswith('#')]
+
+    # sample name is the folder above IDA_Files, repeated names get _2, _3...
+    @staticmethod
+    def sample_names(directories):
+        names, seen = [], {}
+        for directory in directories:
+            name = Path(directory).resolve().parent.name or Path(directory).name
+            seen[name] = seen.get(name, 0) + 1
+            names.append(name if seen[name] == 1 else f"{name}_{seen[name]}")
+        return names
+
+    @staticmethod
+    def init_worker(library):
+        BatchAnalyzer.library = library
+
+    @staticmethod
+    def analyze(directory, output_dir, order='dfs', compression=None, mapped=False, legacy=False, dedup=None):
+        directory, output_dir = Path(directory), Path(output_dir)
+        summary = {'directory': str(directory), 'output': str(output_dir), 'error': None}
+        start_file = directory / "0"
+        if not start_file.exists():
+            summary['error'] = "there is no file called 0"
+            return summary
+        
+        output_dir.mkdir(parents=True, exist_ok=True)
+        FileManager.delete_files([output_dir / name for name in BatchAnalyzer.OUTPUTS])
+        file_paths = [file_path for file_path in directory.iterdir() if file_path.is_file() and file_path.name != "0"]
+        extracted = FunctionExtractor.extract_files([start_file] + file_paths, legacy=legacy, mapped=mapped)
+        if extracted[0] is None:
+            summary['error'] = "could not read file 0"
+            return summary
+        
+        all_functions = FunctionStore() if mapped else {}
+        start_func = find_entry_point(extracted[0][0])
+        for result in extracted:
+            if result:
+                all_functions.update(result[0])
+        
+        lib_functions, lib_non_functions = BatchAnalyzer.library
+        store, known, hints, call_lists = None, None, None, None
+        if dedup:
+            store = FunctionDedupStore(dedup)
+            known = store.register(output_dir.name, all_functions)
+            call_keys, call_lists = store.call_lists(all_functions)
+            summary['known'] = len(known)
+        
+        flow, missing_functions, call_map = CallGraphBuilder.build_call_graph(all_functions, start_func, call_lists, order)
+        new_names = FunctionFilter.filter_functions(all_functions, missing_functions, lib_functions, lib_non_functions)
+        if store:
+            store.store_calls(call_keys, call_lists, call_map)
+            hints = store.hints(new_names, LibraryManager.compile_library(lib_functions, lib_non_functions))
+            store.close()
+        
+        FileManager.write_all_func_file(all_functions, missing_functions, lib_functions, lib_non_functions, output_dir, hints)
+        FileManager.write_output_files(flow, all_functions, call_map, missing_functions, lib_functions, lib_non_functions,
+                                       compression, output_dir=output_dir, known=known)
+        
+        summary.update({'entry': start_func, 'functions': len(all_functions), 'missing': len(missing_functions),
+                        'files_failed': sum(1 for result in extracted if result is None),
+                        'new_names': sorted({clean_function_name(name) for name in new_names})})
+        if mapped:
+            all_functions.close()
+        return summary
+
+    @staticmethod
+    def analyze_safe(*args):
+        try:
+            return BatchAnalyzer.analyze(*args)
+        except Exception as e:
+            return {'directory': str(args[0]), 'output': str(args[1]), 'error': f"{type(e).__name__}: {e}"}
+
+    @staticmethod
+    def run(directories, output_root, jobs=1, library=None, order='dfs', compression=None, mapped=False, legacy=False, dedup=None):
+        library = library or LibraryManager.load_library()
+        output_root = Path(output_root)
+        names = BatchAnalyzer.sample_names(directories)
+        tasks = [(directory, output_root / name, order, compression, mapped, legacy, dedup) for directory, name in zip(directories, names)]
+        
+        if jobs > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=BatchAnalyzer.init_worker, initargs=(library,)) as pool:
+                summaries = list(pool.map(BatchAnalyzer.analyze_safe, *zip(*tasks)))
+        else:
+            BatchAnalyzer.init_worker(library)
+            summaries = [BatchAnalyzer.analyze_safe(*task) for task in tasks]
+        
+        for name, summary in zip(names, summaries):
+            summary['sample'] = name
+        return summaries
+
+    # every name still to classify, with the samples it was seen in (most widespread first)
+    @staticmethod
+    def write_summary(summaries, output_root):
+        output_root = Path(output_root)
+        seen = {}
+        for summary in summaries:
+            for name in summary.get('new_names', ()):
+                seen.setdefault(name, []).append(summary['sample'])
+        ranked = sorted(seen.items(), key=lambda item: (-len(item[1]), item[0]))
+        
+        with open(output_root / "batch_summary.txt", "w", encoding='utf-8') as f:
+            f.write(f"=== NEW FUNCTIONS TO CLASSIFY ({len(ranked)} across {len(summaries)} samples) ===\n"
+                    "(add these to pseudo_C_analyzer_lib.txt under FUNCTIONS or NON-FUNCTIONS)\n")
+            for name, samples in ranked:
+                f.write(f"{name}\t{len(samples)}\t{','.join(samples)}\n")
+        
+        with open(output_root / "batch_summary.json", "w", encoding='utf-8') as f:
+            json.dump({'samples': [{key: value for key, value in summary.items() if key != 'new_names'}
+                                   | {'new_names': len(summary.get('new_names', ()))} for summary in summaries],
+                       'new_names': {name: samples for name, samples in ranked}}, f, indent=2)
+        return len(ranked)
+
+# pseudo_C_analyzer.py batch <dir> <dir> ... / --manifest <file>
+def batch_main(argv):
+    parser = argparse.ArgumentParser(prog="pseudo_C_analyzer.py batch")
+    parser.add_argument('directories', nargs='*', help='IDA pseudo-C directories (each must contain 0)')
+    parser.add_argument('-m', '--manifest', help='text file listing one directory per line (relative to the manifest)')
+    parser.add_argument('-o', '--output', default='batch_output', help='root for per-sample output directories (default: batch_output)')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='samples analyzed at once (default: cpu count)')
+    parser.add_argument('--lib', default='pseudo_C_analyzer_lib.txt', help='library file (default: pseudo_C_analyzer_lib.txt)')
+    parser.add_argument('--legacy-extractor', action='store_true', help='use the original per-line regex extractor')
+    parser.add_argument('--mmap', action='store_true', help='keep function bodies in the mapped source files instead of memory')
+    parser.add_argument('--order', choices=['dfs', 'scc'], default='dfs', help='function order (default: dfs)')
+    parser.add_argument('--compress', choices=['gzip', 'zstd'], help='compress organized_code.txt and flow_chart.txt')
+    parser.add_argument('--dedup', help='sqlite store of normalized bodies shared across samples; known bodies are referenced, not repeated')
+    args = parser.parse_args(argv)
+    if args.compress == 'zstd':
+        FileManager.zstd_module()
+    
+    directories = [Path(directory) for directory in args.directories]
+    if args.manifest:
+        directories += BatchAnalyzer.read_manifest(args.manifest)
+    if not directories:
+        parser.error("no directories given (pass them as arguments or with --manifest)")
+    
+    Path(args.output).mkdir(parents=True, exist_ok=True)
+    library = LibraryManager.load_library(args.lib)
+    print(f"analyzing {len(directories)} samples with {min(args.jobs, len(directories))} workers")
+    summaries = BatchAnalyzer.run(directories, args.output, args.jobs, library, args.order, args.compress, args.mmap,
+                                  args.legacy_extractor, args.dedup)
+    
+    for summary in summaries:
+        if summary['error']:
+            print(f"{summary['sample']}: failed ({summary['error']})")
+        else:
+            known = f", {summary['known']} bodies known" if 'known' in summary else ""
+            print(f"{summary['sample']}: {summary['functions']} functions, {summary['missing']} missing{known}, "
+                  f"{len(summary['new_names'])} new to classify -> {summary['output']}")
+    
+    total = BatchAnalyzer.write_summary(summaries, args.output)
+    print(f"new functions to classify across batch: {total}")
+    print(f"summary saved to: {Path(args.output) / 'batch_summary.txt'}, {Path(args.output) / 'batch_summary.json'}")
+    if any(summary['error'] for summary in summaries):
+        sys.exit(1)
+
+# all functions of one IDA_Files directory, the same way main() merges them
+def read_sample(directory, jobs=1):
+    directory = Path(directory)
+    file_paths = sorted(file_path for file_path in directory.iterdir() if file_path.is_file() and file_path.name != "0")
+    all_functions = {}
+    for result in FunctionExtractor.extract_files([directory / "0"] + file_paths, jobs):
+        if result:
+            all_functions.update(result[0])
+    return all_functions
+
+# pseudo_C_analyzer.py similar add <index> <dir> / query <index> <function> [--from <dir>]
+def similar_main(argv):
+    parser = argparse.ArgumentParser(prog="pseudo_C_analyzer.py similar")
+    parser.add_argument('action', choices=['add', 'query'])
+    parser.add_argument('index', help='sqlite similarity index (created on first add)')
+    parser.add_argument('target', help='add: IDA pseudo-C directory / query: function name')
+    parser.add_argument('--sample', help='add: sample name (default: directory above IDA_Files) / query: sample holding the function')
+    parser.add_argument('--from', dest='source', help='query: take the function body from this directory instead of the index')
+    parser.add_argument('-k', type=int, default=10, help='query: number of similar functions to list (default: 10)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='add: worker processes for extraction (default: 1)')
+    args = parser.parse_args(argv)
+    
+    if args.action == 'query' and not Path(args.index).exists():
+        print(f"Error: '{args.index}' does not exist", file=sys.stderr)
+        sys.exit(1)
+    
+    index = SimilarityIndex(args.index)
+    try:
+        if args.action == 'add':
+            directory = Path(args.target)
+            if not (directory / "0").exists():
+                print("there is no file called 0", file=sys.stderr)
+                sys.exit(1)
+            sample = args.sample or directory.resolve().parent.name
+            count = index.add(sample, read_sample(directory, args.jobs))
+            print(f"indexed {count} functions of sample '{sample}' in {args.index}")
+            return
+        
+        if args.source:
+            all_functions = read_sample(args.source, args.jobs)
+            if args.target not in all_functions:
+                raise LookupError(f"function '{args.target}' not found in {args.source}")
+            signature = index.signature(SimilarityIndex.shingles(all_functions[args.target], args.target))
+            exclude = None
+        else:
+            sample, signature = index.stored_signature(args.target, args.sample)
+            exclude = (sample, args.target)
+        
+        for similarity, sample, name in index.query(signature, args.k, exclude):
+            print(f"{similarity:.2f}\t{sample}\t{name}")
+    except LookupError as e:
+        print(f"Error: {e.args[0]}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        index.close()
+
+# pseudo_C_analyzer.py diff <old dir> <new dir>
+def diff_main(argv):
+    parser = argparse.ArgumentParser(prog="pseudo_C_analyzer.py diff")
+    parser.add_argument('old', help='IDA pseudo-C directory of the known sample')
+    parser.add_argument('new', help='IDA pseudo-C directory of the new variant')
+    parser.add_argument('-o', '--output', help='also save the diff as json')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='worker processes for extraction (default: 1)')
+    args = parser.parse_args(argv)
+    
+    graphs = []
+    for directory in (args.old, args.new):
+        if not (Path(directory) / "0").exists():
+            print(f"there is no file called 0 in {directory}", file=sys.stderr)
+            sys.exit(1)
+        all_functions = read_sample(directory, args.jobs)
+        _, _, call_map = CallGraphBuilder.build_call_graph(all_functions, None)
+        graphs.extend([all_functions, call_map])
+    
+    result = CallGraphDiff.diff(*graphs)
+    for sign, key in (('+', 'added'), ('-', 'removed'), ('~', 'modified')):
+        for name in result[key]:
+            print(f"{sign} {name}")
+    for sign, key in (('+', 'calls_added'), ('-', 'calls_removed')):
+        for caller, callee in result[key]:
+            print(f"{sign} {caller} -> {callee}")
+    print(f"functions: {len(result['added'])} added, {len(result['removed'])} removed, {len(result['modified'])} modified; "
+          f"calls: {len(result['calls_added'])} added, {len(result['calls_removed'])} removed; "
+          f"{result['unchanged_subtrees']} unchanged subtrees skipped")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"diff saved to: {args.output}")
+
+# pseudo_C_analyzer.py show <function> [--index organized_code.txt.idx]
+def show_main(argv):
+    parser = argparse.ArgumentParser(prog="pseudo_C_analyzer.py show")
+    parser.add_argument('function', help='function name as listed in organized_code.txt')
+    parser.add_argument('--index', default='organized_code.txt.idx', help='sidecar index (default: organized_code.txt.idx)')
+    args = parser.parse_args(argv)
+    
+    if not Path(args.index).exists():
+        print(f"Error: '{args.index}' does not exist", file=sys.stderr)
         sys.exit(1)
+    
+    try:
+        func_name, entry, body = FileManager.read_indexed_body(args.index, args.function)
+    except LookupError as e:
+        print(f"Error: {e.args[0]}", file=sys.stderr)
+        sys.exit(1)
+    
+    print(f"// function name: {clean_function_name(func_name)} (position {entry['position']} in execution order)")
+    print(f"// callers: {', '.join(entry['callers']) or '-'}")
+    print(f"// callees: {', '.join(entry['callees']) or '-'}\n")
+    print(body)
 
-    FileManager.delete_files(["organized_code.txt", "flow_chart.txt", "missing_functions.txt", "all_functions.txt"])
+# pseudo_C_analyzer.py query <db> callers|callees|reachable <function> / path <from> <to>
+def query_main(argv):
+    parser = argparse.ArgumentParser(prog="pseudo_C_analyzer.py query")
+    parser.add_argument('db', help='sqlite file written with --db')
+    parser.add_argument('--sample', help='sample name (needed when the database holds more than one)')
+    parser.add_argument('--depth', type=int, help='maximum number of calls to follow (default: 1 for callers/callees, unlimited for reachable)')
+    parser.add_argument('kind', choices=['callers', 'callees', 'reachable', 'path'])
+    parser.add_argument('functions', nargs='+', help='function name (path takes two: from and to)')
+    args = parser.parse_args(argv)
     
-    directory = Path(sys.argv[1])
+    if not Path(args.db).exists():
+        print(f"Error: '{args.db}' does not exist", file=sys.stderr)
+        sys.exit(1)
+    
+    index = CallGraphIndex(args.db)
+    try:
+        sample_id = index.sample_id(args.sample)
+        if args.kind == 'path':
+            if len(args.functions) != 2:
+                parser.error("path needs two functions: from and to")
+            path = index.shortest_path(sample_id, *args.functions)
+            print(" -> ".join(path) if path else f"no call path from {args.functions[0]} to {args.functions[1]}")
+            return
+        
+        depth = args.depth if args.depth is not None or args.kind == 'reachable' else 1
+        found = index.reachable(sample_id, args.functions[0], depth, reverse=args.kind == 'callers')
+        for name, level in sorted(found.items(), key=lambda item: (item[1] or 0, item[0])):
+            print(name if level is None else f"{level}\t{name}")
+    except LookupError as e:
+        print(f"Error: {e.args[0]}", file=sys.stderr)
+        sys.exit(1)
+    finally:
+        index.close()
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'query':
+        return query_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        return batch_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'similar':
+        return similar_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'diff':
+        return diff_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'show':
+        return show_main(sys.argv[2:])
+    
+    parser = argparse.ArgumentParser()
+    parser.add_argument('directory', help='directory with IDA pseudo-C files (must contain 0)')
+    parser.add_argument('--legacy-extractor', action='store_true', help='use the original per-line regex extractor')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='worker processes for extraction (default: 1)')
+    parser.add_argument('--mmap', action='store_true', help='keep function bodies in the mapped source files instead of memory')
+    parser.add_argument('--cache', action='store_true', help='reuse extraction results of unchanged files between runs')
+    parser.add_argument('--order', choices=['dfs', 'scc'], default='dfs',
+                        help='function order: dfs = call order from the entry point, scc = condensed topological order (default: dfs)')
+    parser.add_argument('--root', action='append',
+                        help='only analyze functions reachable from this function (repeatable, default with --depth: entry point)')
+    parser.add_argument('--depth', type=int, help='with --root: follow at most this many calls (default: unlimited)')
+    parser.add_argument('--compress', choices=['gzip', 'zstd'], help='compress organized_code.txt and flow_chart.txt')
+    parser.add_argument('--graph', help='also save the call graph in binary form to this file')
+    parser.add_argument('--db', help='also write the call graph to this sqlite file (shared by any number of samples)')
+    parser.add_argument('--sample', help='sample name in the database (default: name of the directory above IDA_Files)')
+    parser.add_argument('--dedup', help='sqlite store of normalized bodies shared across samples; known bodies are referenced, not repeated')
+    parser.add_argument('--profile', nargs='?', const='profile.json',
+                        help='time every stage and output file, count regex calls, save as json (default: profile.json)')
+    parser.add_argument('--profile-top', type=int, default=10, help='slowest files / largest functions to list (default: 10)')
+    parser.add_argument('--cache-size', type=int, default=CACHE_MAX_SIZE // (1024 * 1024), help='cache size limit in MB (default: 512)')
+    args = parser.parse_args()
+    if args.compress == 'zstd':
+        FileManager.zstd_module()
+
+    FileManager.delete_files(BatchAnalyzer.OUTPUTS)
+    
+    directory = Path(args.directory)
     print(f"scanning directory: {directory}")
     
     start_file = directory / "0"
@@ -345,40 +2320,114 @@ def main():
         print("there is no file called 0")
         sys.exit(1)
     
-    all_functions = {}
+    cache = ExtractionCache(directory, args.cache_size * 1024 * 1024, args.legacy_extractor) if args.cache else None
+    file_paths = [file_path for file_path in directory.iterdir() if file_path.is_file() and file_path.name != "0"]
+    profiler = Profiler(args.profile_top) if args.profile else None
+    if profiler:
+        profiler.instrument()
+    extracted = FunctionExtractor.extract_files([start_file] + file_paths, args.jobs, args.legacy_extractor, cache, args.mmap,
+                                                profiler)
     
-    with open(start_file, 'r', encoding='utf-8', errors='ignore') as f:
-        file_0_functions = FunctionExtractor.extract_functions(f.read())
-        all_functions.update(file_0_functions)
-        print(f"processed file '0': found {len(file_0_functions)} functions, {list(file_0_functions.keys())}")
+    if extracted[0] is None:
+        print("could not read file 0")
+        sys.exit(1)
+    
+    all_functions = FunctionStore() if args.mmap else {}
+    call_lists = {} if cache else None
+    
+    file_0_functions = extracted[0][0]
+    print(f"processed file '0': found {len(file_0_functions)} functions, {list(file_0_functions.keys())}")
     
     start_func = find_entry_point(file_0_functions)
     print(f"entry point function: {start_func}")
+    if args.depth is not None and not args.root and start_func is None:
+        print("no entry function in file 0 to prune from, pass --root")
+        sys.exit(1)
     
-    for file_path in directory.iterdir():
-        if file_path.is_file() and file_path.name != "0":
-            try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    functions = FunctionExtractor.extract_functions(f.read())
-                    all_functions.update(functions)
-            except:
-                continue
+    for result in extracted:
+        if result:
+            all_functions.update(result[0])
+            if cache:
+                call_lists.update(result[1])
+    
+    if cache:
+        print(f"cache: {cache.hits}/{len(extracted)} files reused from {cache.cache_dir}")
     
     if not all_functions:
         return
     
     print(f"total functions found across all files: {len(all_functions)}")
+    if profiler:
+        profiler.record_functions(all_functions)
+    
+    sample = args.sample or directory.resolve().parent.name
+    dedup = FunctionDedupStore(args.dedup) if args.dedup else None
+    known, hints = None, None
+    if dedup:
+        known = dedup.register(sample, all_functions)
+        call_keys, stored_calls = dedup.call_lists(all_functions)
+        call_lists = {**stored_calls, **call_lists} if call_lists else stored_calls
+        print(f"dedup: {len(known)}/{len(all_functions)} bodies already known from other samples in {args.dedup}")
+    
+    if args.root or args.depth is not None:
+        # call lists at the depth limit are left empty, so they are never stored for reuse
+        roots = args.root or [start_func]
+        unknown = [root for root in roots if root not in all_functions]
+        if unknown:
+            print(f"roots not found: {', '.join(unknown)}")
+        with profiler.stage('call graph') if profiler else nullcontext():
+            flow, missing_functions, call_map = CallGraphBuilder.build_reachable_graph(all_functions, roots, args.depth,
+                                                                                        call_lists, args.order)
+        # outputs and db below only see the reached functions
+        all_functions = FunctionSubset(all_functions, call_map)
+        print(f"pruned to functions reachable from {', '.join(roots)}"
+              f"{f' within {args.depth} calls' if args.depth is not None else ''}: {len(all_functions)}")
+    else:
+        with profiler.stage('call graph') if profiler else nullcontext():
+            flow, missing_functions, call_map = CallGraphBuilder.build_call_graph(all_functions, start_func, call_lists, args.order)
+    if dedup and not isinstance(all_functions, FunctionSubset):
+        dedup.store_calls(call_keys, stored_calls, call_map)
+    if start_func in call_map:
+        reachable = GraphTraversal.reachable(call_map, [call_map.index[start_func]])
+        print(f"functions reachable from entry point: {sum(1 for node in reachable if node < call_map.defined)}")
+    with profiler.stage('library filtering') if profiler else nullcontext():
+        lib_functions, lib_non_functions = LibraryManager.load_library()
+        if profiler:
+            # warms the matcher cache so later output stages time only their own writing
+            FunctionFilter.filter_functions(all_functions, missing_functions, lib_functions, lib_non_functions)
     
-    flow, missing_functions, call_map = CallGraphBuilder.build_call_graph(all_functions, start_func)
-    lib_functions, lib_non_functions = LibraryManager.load_library()
+    if dedup:
+        hints = dedup.hints(FunctionFilter.filter_functions(all_functions, missing_functions, lib_functions, lib_non_functions),
+                            LibraryManager.compile_library(lib_functions, lib_non_functions))
+        dedup.close()
     
-    new_count = FileManager.write_all_func_file(all_functions, missing_functions, lib_functions, lib_non_functions)
+    with profiler.stage('all_functions.txt') if profiler else nullcontext():
+        new_count = FileManager.write_all_func_file(all_functions, missing_functions, lib_functions, lib_non_functions, hints=hints)
     if new_count > 0:
         print(f"new functions to classify: {new_count}")
     
-    FileManager.write_output_files(flow, all_functions, call_map, missing_functions, lib_functions, lib_non_functions)
+    FileManager.write_output_files(flow, all_functions, call_map, missing_functions, lib_functions, lib_non_functions, args.compress,
+                                   profiler, known=known)
+    
+    if args.db:
+        index = CallGraphIndex(args.db)
+        index.write_sample(sample, start_func, flow, call_map, LibraryManager.compile_library(lib_functions, lib_non_functions))
+        index.close()
+        print(f"call graph indexed in: {args.db} (sample '{sample}')")
+    
+    if args.graph:
+        call_map.save(args.graph)
+        print(f"call graph saved to: {args.graph} ({len(call_map.names)} names, {call_map.edge_count} calls)")
+    
+    print(f"files created: {FileManager.output_name('organized_code.txt', args.compress)}, "
+          f"{FileManager.output_name('flow_chart.txt', args.compress)}, missing_functions.txt, all_functions.txt")
     
-    print("files created: organized_code.txt, flow_chart.txt, missing_functions.txt, all_functions.txt")
+    if profiler:
+        profiler.restore()
+        print(f"\n{profiler.report()}")
+        with open(args.profile, 'w', encoding='utf-8') as f:
+            json.dump(profiler.to_json(), f, indent=2)
+        print(f"profile saved to: {args.profile}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
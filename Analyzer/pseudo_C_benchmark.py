@@ -0,0 +1,265 @@
+import os
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import subprocess
+import tempfile
+from pathlib import Path
+
+from pseudo_C_analyzer import (FunctionExtractor, CallGraphBuilder, LibraryManager, FunctionFilter,
+                               FileManager, FunctionStore, find_entry_point)
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+FIXTURE_DIR = SCRIPT_DIR.parent / "Example" / "hello" / "IDA"
+LIB_FILE = SCRIPT_DIR / "pseudo_C_analyzer_lib.txt"
+
+GO_PACKAGES = ['runtime', 'internal_runtime_maps', 'internal_runtime_atomic', 'internal_abi', 'internal_bytealg',
+               'internal_godebug', 'sync', 'sync_atomic', 'syscall', 'os', 'fmt', 'strconv', 'reflect', 'errors',
+               'time', 'io', 'unicode_utf8', 'internal_poll', 'internal_fmtsort', 'main']
+GO_TYPES = ['mheap', 'mspan', 'mcache', 'gcWork', 'p', 'm', 'g', 'Map', 'table', 'Value', 'File', 'pp', 'fmt',
+            'Mutex', 'Pool', 'FD', 'Setting', 'Type', 'Name', 'errorString']
+GO_VERBS = ['alloc', 'free', 'grow', 'init', 'lock', 'unlock', 'put', 'get', 'write', 'read', 'scan', 'mark',
+            'sweep', 'park', 'ready', 'print', 'parse', 'format', 'hash', 'copy', 'flush', 'wake', 'stop', 'start']
+GO_NOUNS = ['Span', 'Slot', 'Small', 'Large', 'Stack', 'Word', 'Bits', 'Int', 'String', 'Bytes', 'Args', 'Ptr',
+            'Fast64', 'Fast32', 'Header', 'Buf', 'Locked', 'Value', 'Key', 'Entry', 'Worker', 'Signal']
+RETURN_TYPES = ['__int64', '__int64', 'void', 'void', 'bool', 'char *', '_QWORD *', 'unsigned __int64', 'retval_{addr}']
+MISSING_CALLS = ['runtime_morestack_noctxt', 'runtime_panicIndex', 'runtime_gcWriteBarrier2', 'LODWORD', 'HIDWORD',
+                 'runtime_memmove', 'runtime_throw', 'runtime_newobject', 'JUMPOUT', '_InterlockedExchange']
+
+# bytes of pseudo-C per synthetic function, close to the hello example
+FUNCTION_SIZE = 1230
+
+
+class CorpusGenerator:
+    """
+    1. make Go-runtime-like function names (package, optional receiver type, method, closures)
+    2. write IDA style functions: address banner, source comment, signature, locals, nested blocks
+    3. calls go mostly to other generated functions, some to helpers that are never defined
+    4. the file 0 entry point calls the first function, like rt0_amd64 does
+    5. output is streamed to disk, so large scales don't need the corpus in memory
+    """
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+
+    def function_names(self, count):
+        names = []
+        seen = set()
+        while len(names) < count:
+            package = self.random.choice(GO_PACKAGES)
+            if self.random.random() < 0.4:
+                name = f"{package}__ptr_{self.random.choice(GO_TYPES)}_{self.random.choice(GO_VERBS)}{self.random.choice(GO_NOUNS)}"
+            else:
+                name = f"{package}_{self.random.choice(GO_VERBS)}{self.random.choice(GO_NOUNS)}"
+            if self.random.random() < 0.15:
+                name += f"_func{self.random.randint(1, 4)}"
+            base, n = name, 1
+            while name in seen:
+                n += 1
+                name = f"{base}{n}"
+            seen.add(name)
+            names.append(name)
+        return names
+
+    def function(self, index, name, names):
+        rng = self.random
+        address = f"{0x1001000 + index * 0x60:X}"
+        return_type = rng.choice(RETURN_TYPES).format(addr=address)
+        params = rng.randint(0, 9)
+        lines = [f"//----- ({address:0>16}) ----------------------------------------------------",
+                 f"// {name.replace('_', '.', 1)}"]
+
+        if params > 4:
+            lines.append(f"{return_type} __golang {name}(")
+            lines.extend(f"        __int64 a{n}{',' if n < params else ')'}" for n in range(1, params + 1))
+        else:
+            lines.append(f"{return_type} __golang {name}({', '.join(f'__int64 a{n}' for n in range(1, params + 1))})")
+        lines.append("{")
+
+        local_count = rng.randint(2, 12)
+        for n in range(local_count):
+            lines.append(f"  {rng.choice(['__int64', 'unsigned __int64', 'bool', 'char', '_QWORD *'])} v{params + n + 1}; // {rng.choice(['rax', 'rbx', 'rcx', 'rdx', 'rsi', 'rdi', 'r8'])}")
+        lines.append("")
+
+        statements = rng.randint(6, 30)
+        depth = 1
+        for _ in range(statements):
+            indent = "  " * depth
+            variable = f"v{rng.randint(params + 1, params + local_count)}"
+            roll = rng.random()
+            if roll < 0.35:
+                callee = rng.choice(names) if rng.random() < 0.8 else rng.choice(MISSING_CALLS)
+                args = ', '.join(rng.choice([variable, f"a{rng.randint(1, max(params, 1))}", f"{rng.randint(0, 64)}LL"])
+                                 for _ in range(rng.randint(0, 4)))
+                lines.append(f"{indent}{variable} = {callee}({args});" if rng.random() < 0.6 else f"{indent}{callee}({args});")
+            elif roll < 0.55 and depth < 5:
+                lines.append(f"{indent}{rng.choice(['if', 'while'])} ( {variable} {rng.choice(['>', '<', '==', '!='])} {rng.randint(0, 255)} )")
+                lines.append(f"{indent}{{")
+                depth += 1
+            elif roll < 0.7 and depth > 1:
+                depth -= 1
+                lines.append(f"{'  ' * depth}}}")
+            elif roll < 0.8:
+                lines.append(f"{indent}*(_QWORD *)(qword_{rng.randint(0x1100000, 0x11FFFFF):X} + 8 * {variable}) = {variable};")
+            else:
+                lines.append(f"{indent}{variable} = {variable} + 0x{rng.randint(1, 0xFFFF):X}LL;")
+
+        while depth > 1:
+            depth -= 1
+            lines.append(f"{'  ' * depth}}}")
+        lines.append("  return;" if return_type == 'void' else f"  return v{params + 1};")
+        lines.append("}")
+        lines.append(f"// {address}: using guessed type __int64 __fastcall {name}(_QWORD);")
+        lines.append("")
+        return '\n'.join(lines) + '\n'
+
+    # write an IDA_Files style directory (0 + hello.c) of about scale times the hello example
+    def write_corpus(self, directory, scale):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        target = int(scale * FIXTURE_DIR.joinpath("hello.c").stat().st_size)
+        names = self.function_names(max(1, target // FUNCTION_SIZE))
+
+        with open(directory / "0", "w", encoding="utf-8") as f:
+            f.write("// _rt0_amd64_synthetic\n// attributes: thunk\n"
+                    "void __golang __noreturn rt0_amd64_synthetic(int a1, int a2)\n{\n"
+                    f"  {names[0]}(a1, a2);\n}}\n")
+
+        with open(directory / "hello.c", "w", encoding="utf-8", buffering=1024 * 1024) as f:
+            f.write("/* This file was generated by the Hex-Rays decompiler (synthetic benchmark corpus).\n*/\n\n"
+                    "#include <defs.h>\n\n")
+            for index, name in enumerate(names):
+                f.write(self.function(index, name, names))
+        return directory
+
+
+class StageTimer:
+    # wall time of named stages, the best of all repeats is kept
+    def __init__(self):
+        self.stages = {}
+
+    def measure(self, stage, function, *args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        self.stages[stage] = min(elapsed, self.stages.get(stage, elapsed))
+        return result
+
+
+def run_pipeline(directory, timer, jobs=1, mmap=False):
+    directory = Path(directory)
+    paths = [directory / "0"] + [path for path in directory.iterdir() if path.is_file() and path.name != "0"]
+
+    extracted = timer.measure('extract_functions', FunctionExtractor.extract_files, paths, jobs, False, None, mmap)
+    all_functions = FunctionStore() if mmap else {}
+    for result in extracted:
+        if result:
+            all_functions.update(result[0])
+    start_func = find_entry_point(extracted[0][0]) if extracted[0] else None
+
+    flow, missing_functions, call_map = timer.measure('build_call_graph', CallGraphBuilder.build_call_graph,
+                                                      all_functions, start_func)
+
+    def load_and_filter():
+        LibraryManager._matchers.clear()
+        lib_functions, lib_non_functions = LibraryManager.load_library(str(LIB_FILE))
+        FunctionFilter.filter_functions(all_functions, missing_functions, lib_functions, lib_non_functions)
+        return lib_functions, lib_non_functions
+    lib_functions, lib_non_functions = timer.measure('load_library_filtering', load_and_filter)
+
+    def write_outputs():
+        FileManager.write_all_func_file(all_functions, missing_functions, lib_functions, lib_non_functions)
+        FileManager.write_output_files(flow, all_functions, call_map, missing_functions, lib_functions, lib_non_functions)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as output_dir:
+        os.chdir(output_dir)
+        try:
+            timer.measure('output_writing', write_outputs)
+        finally:
+            os.chdir(cwd)
+
+    return {'functions': len(all_functions), 'calls': call_map.edge_count, 'missing_functions': len(missing_functions)}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_file):
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+    baseline = {run['corpus']: run for run in previous['runs']}
+
+    print(f"\ncompared with {baseline_file} (commit {previous.get('commit')})")
+    for run in results['runs']:
+        old = baseline.get(run['corpus'])
+        if not old:
+            continue
+        for stage, seconds in run['stages'].items():
+            if old['stages'].get(stage):
+                print(f"{run['corpus']:>8} {stage:<24} {old['stages'][stage]:9.3f}s -> {seconds:9.3f}s "
+                      f"({seconds / old['stages'][stage]:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', type=float, nargs='*', default=[10, 100, 1000],
+                        help='synthetic corpus sizes as multiples of Example/hello (default: 10 100 1000)')
+    parser.add_argument('--corpus-dir', default='benchmark_corpora', help='where synthetic corpora are generated and kept')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per corpus, the fastest is reported (default: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='generator seed (default: 0)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='extraction worker processes (default: 1)')
+    parser.add_argument('--mmap', action='store_true', help='benchmark the mmap function store')
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help='results file (default: benchmark_results.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    args = parser.parse_args()
+
+    corpora = [('hello', FIXTURE_DIR)]
+    for scale in args.scales:
+        label = f"{scale:g}x"
+        directory = Path(args.corpus_dir) / f"{label}_seed{args.seed}"
+        if not (directory / "0").exists():
+            print(f"generating {label} corpus in {directory}")
+            shutil.rmtree(directory, ignore_errors=True)
+            CorpusGenerator(args.seed).write_corpus(directory, scale)
+        corpora.append((label, directory))
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': {'jobs': args.jobs, 'mmap': args.mmap, 'repeat': args.repeat, 'seed': args.seed},
+        'runs': []
+    }
+
+    for label, directory in corpora:
+        timer = StageTimer()
+        for _ in range(args.repeat):
+            counts = run_pipeline(directory, timer, args.jobs, args.mmap)
+        size = sum(path.stat().st_size for path in Path(directory).iterdir() if path.is_file())
+        run = {'corpus': label, 'size_bytes': size, **counts, 'stages': timer.stages, 'total': sum(timer.stages.values())}
+        results['runs'].append(run)
+
+        print(f"{label:>8}: {size / 1024 / 1024:8.1f} MB, {counts['functions']} functions, {counts['calls']} calls")
+        for stage, seconds in timer.stages.items():
+            print(f"          {stage:<24} {seconds:9.3f}s")
+        print(f"          {'total':<24} {run['total']:9.3f}s ({size / 1024 / 1024 / run['total']:.1f} MB/s)")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"results saved to: {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import sys
+import random
+import fnmatch
+from pathlib import Path
+
+import pytest
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from pseudo_C_analyzer import GlobMatcher, LibraryMatcher, LibraryManager, read_sample  # noqa: E402
+
+FIXTURE_DIR = SCRIPT_DIR.parent / "Example" / "hello" / "IDA"
+LIB_FILE = SCRIPT_DIR / "pseudo_C_analyzer_lib.txt"
+
+# small alphabet, so random patterns and names hit each other often
+ALPHABET = 'ab_.'
+PATTERN_PIECES = ['*', '?', '[ab]', '[!a]', '[a-b]', '[_]', 'a', 'b', '_', '.', 'ab', 'runtime_']
+
+
+def fnmatch_any(name, patterns):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def random_pattern(rng):
+    shape = rng.random()
+    body = ''.join(rng.choice(ALPHABET) for _ in range(rng.randrange(0, 5)))
+    # exact names, prefix/suffix globs and the general case each get their share
+    if shape < 0.15:
+        return body
+    if shape < 0.3:
+        return body + '*'
+    if shape < 0.45:
+        return '*' + body
+    if shape < 0.5:
+        return '*' + body + '*'
+    return ''.join(rng.choice(PATTERN_PIECES) for _ in range(rng.randrange(1, 6)))
+
+
+def random_name(rng):
+    return ''.join(rng.choice(ALPHABET + 'r') for _ in range(rng.randrange(0, 9)))
+
+
+@pytest.mark.parametrize('seed', range(50))
+def test_random_patterns_match_fnmatch(seed):
+    rng = random.Random(seed)
+    patterns = {random_pattern(rng) for _ in range(rng.randrange(1, 25))}
+    matcher = GlobMatcher(patterns)
+    for _ in range(300):
+        name = random_name(rng)
+        assert matcher.matches(name) == fnmatch_any(name, patterns), (name, sorted(patterns))
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_library_matcher_classifies_like_fnmatch(seed):
+    rng = random.Random(1000 + seed)
+    functions = {random_pattern(rng) for _ in range(rng.randrange(0, 15))}
+    non_functions = {random_pattern(rng) for _ in range(rng.randrange(0, 15))}
+    matcher = LibraryMatcher(functions, non_functions)
+    for _ in range(300):
+        name = random_name(rng)
+        expected = ('FUNCTIONS' if fnmatch_any(name, functions) else
+                    'NON-FUNCTIONS' if fnmatch_any(name, non_functions) else None)
+        # twice: the second answer comes from the memo
+        assert matcher.classify(name) == expected
+        assert matcher.classify(name) == expected
+
+
+def test_hello_functions_against_shipped_lib():
+    lib_functions, lib_non_functions = LibraryManager.load_library(str(LIB_FILE))
+    names = list(read_sample(FIXTURE_DIR))
+    assert names and (lib_functions or lib_non_functions)
+
+    functions = GlobMatcher(lib_functions)
+    non_functions = GlobMatcher(lib_non_functions)
+    for name in names:
+        assert functions.matches(name) == fnmatch_any(name, lib_functions), name
+        assert non_functions.matches(name) == fnmatch_any(name, lib_non_functions), name
+    # the lib is meant to classify most of the runtime, make sure the comparison isn't vacuous
+    assert any(functions.matches(name) or non_functions.matches(name) for name in names)
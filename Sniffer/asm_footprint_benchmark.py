@@ -0,0 +1,322 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import tempfile
+from pathlib import Path
+
+from asm_footprint_sniffer import IoCScanner
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+LIB_FILE = SCRIPT_DIR / IoCScanner.LIB_FILE
+
+# bump when the listings change, results are only compared between listings of the same generator
+GENERATOR_VERSION = 1
+
+INSTRUCTIONS = ['mov     rax, [rsp+{o:X}h+var_{v:X}]', 'lea     rdx, unk_{a:X}', 'call    runtime_morestack_noctxt',
+                'call    {f}', 'cmp     rsp, [r14+10h]', 'jbe     short loc_{a:X}', 'xorps   xmm15, xmm15',
+                'add     rsp, {o:X}h', 'retn', 'mov     [rsp+{o:X}h+var_{v:X}], rbx', 'test    al, al',
+                'jnz     loc_{a:X}', 'lea     rax, off_{a:X}', 'movups  xmmword ptr [rsp+{o:X}h+var_{v:X}], xmm15']
+FUNCTIONS = ['runtime_gopark', 'runtime_newobject', 'runtime_memmove', 'fmt_Fprintln', 'os_ReadFile',
+             'net_http___ptr_Client_Do', 'sync___ptr_Mutex_Lock', 'main_run', 'main_connect', 'main_decrypt']
+WORDS = ['update', 'cdn', 'api', 'mail', 'static', 'files', 'panel', 'relay', 'sync', 'node', 'edge', 'auth',
+         'gate', 'data', 'cloud', 'storage', 'login', 'beacon', 'stage', 'drop']
+TLDS = ['com', 'net', 'org', 'io', 'ru', 'cn', 'tk', 'xyz', 'onion', 'top']
+EXTENSIONS = ['exe', 'dll', 'sys', 'bat', 'ps1', 'vbs', 'dat', 'log', 'txt']
+PROJECT_DIRS = ['work', 'project', 'src', 'build', 'code']
+HIVES = ['HKEY_LOCAL_MACHINE', 'HKEY_CURRENT_USER', 'HKEY_CLASSES_ROOT']
+
+
+class ListingGenerator:
+    """
+    1. write an IDA .asm listing: header box with Input SHA256/MD5/CRC32, __text instructions with subroutine
+       banners, then a __cstring segment of db strings, like a Go sample disassembled with IDA
+    2. density is the number of IoCs (URLs, domains, files, paths, registry keys, main.* / SSH references)
+       per 1000 lines, spread through code comments and strings
+    3. lib_hit of the domains and URLs use a lib term, so the lib filter has something to drop
+    4. output is streamed to disk until the target size, so multi-GB listings don't need memory
+    """
+    def __init__(self, seed=0, density=5.0, lib_terms=(), lib_hit=0.2):
+        self.random = random.Random(seed)
+        self.density = density / 1000
+        self.lib_terms = [term for term in lib_terms if '.' in term and '/' not in term and '\\' not in term]
+        self.lib_hit = lib_hit if self.lib_terms else 0
+
+    def domain(self):
+        rng = self.random
+        if rng.random() < self.lib_hit:
+            return f"{rng.choice(WORDS)}.{rng.choice(self.lib_terms)}"
+        return f"{rng.choice(WORDS)}{rng.randint(0, 999)}.{rng.choice(WORDS)}.{rng.choice(TLDS)}"
+
+    def ioc(self):
+        rng = self.random
+        kind = rng.randrange(9)
+        if kind == 0:
+            scheme = rng.choice(['http', 'https', 'https', 'ftp', 'socks5'])
+            return f"{scheme}://{self.domain()}/{rng.choice(WORDS)}/{rng.choice(WORDS)}?id={rng.randint(0, 99999)}"
+        if kind == 1:
+            return self.domain()
+        if kind == 2:
+            return f"{rng.choice(WORDS)}_{rng.randint(0, 99)}.{rng.choice(EXTENSIONS)}"
+        if kind == 3:
+            return f"C:\\{rng.choice(PROJECT_DIRS)}\\{rng.choice(WORDS)}\\{rng.choice(WORDS)}.{rng.choice(EXTENSIONS)}"
+        if kind == 4:
+            return f"\\\\{rng.choice(WORDS)}-srv\\{rng.choice(WORDS)}\\{rng.choice(WORDS)}.{rng.choice(EXTENSIONS)}"
+        if kind == 5:
+            return f"{rng.choice(HIVES)}\\Software\\{rng.choice(WORDS).title()}\\{rng.choice(WORDS).title()}"
+        if kind == 6:
+            return f"main.{rng.choice(WORDS)}{rng.choice(WORDS).title()}"
+        if kind == 7:
+            return f"{rng.choice(['ssh', 'golang.org/x/crypto/ssh'])}.{rng.choice(['SSHClient', 'NewSSHClientConfig', 'SSHSession'])}"
+        return f"{rng.choice(['curve25519-sha256', 'chacha20-poly1305', 'hostkeys-00'])}@openssh.com"
+
+    def header(self):
+        rng = self.random
+        return ("; +-------------------------------------------------------------------------+\n"
+                "; |   This file was generated by the Interactive Disassembler (IDA)        |\n"
+                "; |           Copyright (c) 2024 Hex-Rays, <support@hex-rays.com>          |\n"
+                "; +-------------------------------------------------------------------------+\n"
+                f"; Input SHA256 : {rng.getrandbits(256):064X}\n"
+                f"; Input MD5    : {rng.getrandbits(128):032X}\n"
+                f"; Input CRC32  : {rng.getrandbits(32):08X}\n"
+                "; File Name   : C:\\Users\\analyst\\samples\\synthetic.exe\n"
+                "; Format      : Portable executable for AMD64 (PE)\n"
+                "; Imagebase   : 140000000\n\n")
+
+    def code_line(self, address):
+        rng = self.random
+        line = f"__text:{address:016X}                 " + rng.choice(INSTRUCTIONS).format(
+            o=rng.randrange(8, 0x200), v=rng.randrange(8, 0x100), a=address + rng.randrange(0x1000), f=rng.choice(FUNCTIONS))
+        if rng.random() < self.density:
+            line += f"  ; {self.ioc()}"
+        return line
+
+    def string_line(self, address):
+        rng = self.random
+        text = self.ioc() if rng.random() < self.density * 20 else \
+            ' '.join(rng.choice(WORDS) for _ in range(rng.randint(2, 8)))
+        return f"__cstring:{address:016X} a{rng.choice(WORDS).title()}{address & 0xFFFF:X} db '{text}',0"
+
+    # write about size bytes, nine tenths code and one tenth strings
+    def write_listing(self, path, size):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        written = 0
+        with open(path, "w", encoding="utf-8", buffering=1024 * 1024) as f:
+            written += f.write(self.header())
+            address = 0x140001000
+            while written < size * 0.9:
+                lines = []
+                for n in range(1000):
+                    if n % 40 == 0:
+                        lines.append(f"__text:{address:016X} ; =============== S U B R O U T I N E =======================================")
+                        lines.append(f"__text:{address:016X} sub_{address:X}       proc near")
+                    lines.append(self.code_line(address))
+                    address += 4
+                written += f.write('\n'.join(lines) + '\n')
+            address = 0x1400F0000
+            while written < size:
+                lines = [self.string_line(address + n * 0x20) for n in range(200)]
+                address += 200 * 0x20
+                written += f.write('\n'.join(lines) + '\n')
+        return path
+
+
+class StageTimer:
+    # wall time of named stages, the best of all repeats is kept
+    def __init__(self):
+        self.stages = {}
+
+    def measure(self, stage, function, *args, **kwargs):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        elapsed = time.perf_counter() - start
+        self.stages[stage] = min(elapsed, self.stages.get(stage, elapsed))
+        return result
+
+
+def write_lib(directory, lib_size, seed):
+    # the shipped lib plus lib_size generated domains; the scanner reads the lib from the working directory
+    rng = random.Random(seed)
+    terms = [line.strip() for line in LIB_FILE.read_text(encoding='utf-8').splitlines()
+             if line.strip() and not line.startswith(('#', '==='))] if LIB_FILE.exists() else []
+    terms += [f"{rng.choice(WORDS)}{n}-{rng.choice(WORDS)}.{rng.choice(TLDS)}" for n in range(lib_size)]
+    with open(Path(directory) / IoCScanner.LIB_FILE, 'w', encoding='utf-8') as f:
+        f.write("=== BENCHMARK LIB ===\n" + '\n'.join(terms) + '\n')
+    return terms
+
+
+def run_stages(scanner, path, timer):
+    def read():
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+    content = timer.measure('read', read)
+    timer.measure('extract_ida_metadata', scanner.extract_ida_metadata, content)
+    cleaned_content = timer.measure('clean_content', scanner.clean_content, content)
+    del content
+    strings = timer.measure('extract_strings', scanner.extract_strings, cleaned_content)
+    views = [cleaned_content, '\n'.join(strings)]
+    del cleaned_content, strings
+    # the two halves of content_candidates, on the listing and on its strings: anchor scan plus the path
+    # patterns that can span lines, then the line-bound path/IoC patterns on the anchored lines plus the lib/IoC checks
+    def extract_paths():
+        found = scanner.empty_found()
+        hot_lines = []
+        for view in views:
+            lines, triggered = scanner.anchored_lines(view)
+            hot_lines.append(lines)
+            for name, pattern in scanner.text_patterns.items():
+                if name in triggered:
+                    scanner.collect('paths', None, pattern.finditer(view), found)
+        return found, hot_lines
+
+    def match_patterns(found, hot_lines):
+        for lines in hot_lines:
+            scanner.collect_line_matches(lines, found)
+        return scanner.filter_candidates(found)
+
+    found, hot_lines = timer.measure('path_extraction', extract_paths)
+    del views
+    found = timer.measure('pattern_matching', match_patterns, found, hot_lines)
+
+    result = scanner.build_result({'file': str(path)}, found) or {'file': str(path)}
+    results = [dict(result, file=f"{path}.{n}") for n in range(100)]
+    timer.measure('report_text', scanner.generate_report, results, 'text')
+    timer.measure('report_json', scanner.generate_report, results, 'json')
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# regressions against an earlier results file: stages slower by more than max_regression (and min_seconds),
+# and, for listings of the same generator options, IoC counts that changed
+def compare(results, baseline_file, max_regression, min_seconds):
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+    baseline = {run['listing']: run for run in previous['runs']}
+    same_listings = previous.get('generator') == results['generator']
+    failures = []
+
+    print(f"\ncompared with {baseline_file} (commit {previous.get('commit')})")
+    for run in results['runs']:
+        old = baseline.get(run['listing'])
+        if not old:
+            continue
+        for stage, seconds in run['stages'].items():
+            before = old['stages'].get(stage)
+            if not before:
+                continue
+            slower = seconds > before * (1 + max_regression) and seconds - before > min_seconds
+            print(f"{run['listing']:>8} {stage:<22} {before:9.3f}s -> {seconds:9.3f}s ({seconds / before:.2f}x)"
+                  f"{'  REGRESSION' if slower else ''}")
+            if slower:
+                failures.append(f"{run['listing']} {stage}: {before:.3f}s -> {seconds:.3f}s")
+        if same_listings and old.get('iocs') != run['iocs']:
+            failures.append(f"{run['listing']} IoC counts changed: {old.get('iocs')} -> {run['iocs']}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=float, nargs='*', default=[1, 16],
+                        help='synthetic listing sizes in MB (default: 1 16; e.g. 1 64 1024 4096)')
+    parser.add_argument('--density', type=float, default=5.0, help='IoCs per 1000 listing lines (default: 5)')
+    parser.add_argument('--lib-size', type=int, default=1000,
+                        help='generated entries added to the shipped lib (default: 1000)')
+    parser.add_argument('--lib-hit', type=float, default=0.2,
+                        help='fraction of generated domains/URLs that a lib entry filters (default: 0.2)')
+    parser.add_argument('--listing-dir', default='benchmark_listings', help='where synthetic listings are generated and kept')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per listing, the fastest is reported (default: 3)')
+    parser.add_argument('--seed', type=int, default=0, help='generator seed (default: 0)')
+    parser.add_argument('--stage-limit', type=float, default=512,
+                        help='listings above this many MB only get the --stream end-to-end run (default: 512)')
+    parser.add_argument('--chunk', type=int, default=16, help='MB per chunk for the --stream run (default: 16)')
+    parser.add_argument('-o', '--output', default='sniffer_benchmark_results.json',
+                        help='results file (default: sniffer_benchmark_results.json)')
+    parser.add_argument('--compare', help='earlier results file; a regression against it fails the run (exit status 1)')
+    parser.add_argument('--max-regression', type=float, default=0.25,
+                        help='allowed slowdown per stage for --compare (default: 0.25 = 25%%)')
+    parser.add_argument('--min-seconds', type=float, default=0.05,
+                        help='slowdowns below this many seconds are noise for --compare (default: 0.05)')
+    args = parser.parse_args()
+
+    generator = {'version': GENERATOR_VERSION, 'seed': args.seed, 'density': args.density,
+                 'lib_size': args.lib_size, 'lib_hit': args.lib_hit}
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'generator': generator,
+        'options': {'repeat': args.repeat, 'stage_limit': args.stage_limit, 'chunk': args.chunk},
+        'runs': []
+    }
+
+    listing_dir = Path(args.listing_dir).resolve()
+    output = Path(args.output).resolve()
+    compare_file = Path(args.compare).resolve() if args.compare else None
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as lib_dir:
+        lib_terms = write_lib(lib_dir, args.lib_size, args.seed)
+        os.chdir(lib_dir)
+        try:
+            scanner = IoCScanner(verbose=False)
+            stream_scanner = IoCScanner(verbose=False, chunk_size=args.chunk * 1024 * 1024)
+            for size_mb in args.sizes:
+                label = f"{size_mb:g}MB"
+                path = listing_dir / (f"{label}_v{GENERATOR_VERSION}_seed{args.seed}_d{args.density:g}"
+                                      f"_lib{args.lib_size}_hit{args.lib_hit:g}.asm")
+                if not path.exists():
+                    print(f"generating {label} listing in {path}")
+                    ListingGenerator(args.seed, args.density, lib_terms, args.lib_hit).write_listing(path, size_mb * 1024 * 1024)
+
+                timer = StageTimer()
+                for _ in range(args.repeat):
+                    if size_mb <= args.stage_limit:
+                        run_stages(scanner, path, timer)
+                        result = timer.measure('end_to_end', scanner.scan_file, path)
+                    result = timer.measure('end_to_end_stream', stream_scanner.scan_file, path)
+                if result and result.get('error'):
+                    print(f"Error: scanning {path} failed: {result['error']}", file=sys.stderr)
+                    sys.exit(1)
+
+                size = path.stat().st_size
+                iocs = {category: len(values) for category, values in (result or {}).get('iocs', {}).items()}
+                throughput = {stage: size / 1024 / 1024 / seconds for stage, seconds in timer.stages.items()
+                              if stage.startswith('end_to_end') and seconds}
+                results['runs'].append({'listing': label, 'size_bytes': size, 'iocs': iocs,
+                                        'stages': timer.stages, 'mb_per_s': throughput})
+
+                print(f"{label:>8}: {size / 1024 / 1024:8.1f} MB, {sum(iocs.values())} IoCs")
+                for stage, seconds in timer.stages.items():
+                    rate = f" ({throughput[stage]:.1f} MB/s)" if stage in throughput else ""
+                    print(f"          {stage:<22} {seconds:9.3f}s{rate}")
+        finally:
+            os.chdir(cwd)
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"results saved to: {output}")
+
+    if compare_file:
+        failures = compare(results, compare_file, args.max_regression, args.min_seconds)
+        if failures:
+            print(f"\n{len(failures)} regression(s):", file=sys.stderr)
+            for failure in failures:
+                print(f"  {failure}", file=sys.stderr)
+            sys.exit(1)
+        print("no regressions")
+
+
+if __name__ == "__main__":
+    main()
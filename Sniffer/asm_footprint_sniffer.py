@@ -1,10 +1,21 @@
+import os
 import re
 import sys
+import time
 import argparse
+import contextlib
 import json
+import zlib
+import sqlite3
+import hashlib
+import marshal
+import multiprocessing
+import multiprocessing.connection
+from array import array
 from pathlib import Path
-from typing import List, Dict, Set, Optional
+from typing import List, Dict, Set, Optional, Iterable, Iterator
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 
 class IoCScanner:    
@@ -32,9 +43,26 @@ class IoCScanner:
         'dependency_paths': 'Dependency/Library Paths'
     }
     
-    def __init__(self):
+    LIB_FILE = "asm_footprint_sniffer_lib.txt"
+    # part of the ScanStore version, bump when is_valid_windows_path, is_valid_ioc or the candidate format change
+    STORE_FORMAT = 2
+    # bytes read to find the Input SHA256 of a listing in the IDA header
+    HEADER_SIZE = 64 * 1024
+    
+    # scanner of a --jobs worker process, created once by init_worker
+    worker = None
+    
+    def __init__(self, verbose: bool = True, chunk_size: Optional[int] = None, overlap: int = 64 * 1024,
+                 store: Optional[str] = None):
+        self.verbose = verbose
+        self.store_path = store
+        # chunk_size: stream files in chunks of this many characters (stream_candidates) instead of reading them whole
+        self.chunk_size = max(chunk_size, 2 * overlap) if chunk_size else None
+        self.overlap = overlap
         self._initialize_patterns()
         self.lib = self.load_lib()
+        self.lib_matcher = LibAutomaton.cached(self.lib, self.LIB_FILE + '.ac') if self.lib else None
+        self.store = ScanStore(store, self.candidate_version(), LibAutomaton.digest(self.lib)) if store else None
         
     def _initialize_patterns(self):
         self.ioc_patterns = {
@@ -79,20 +107,41 @@ class IoCScanner:
             'dependency': re.compile(r'(?:go[/\\]pkg[/\\]|[/\\]program files(?:\s\(x86\))?[/\\])', re.IGNORECASE)
         }
         
+        # literal every match of a pattern has to contain; one scan for all of them finds the lines
+        # (or, for patterns that can run across lines, the files) where a pattern can match at all.
+        # The quoted drive and UNC paths are anchored on their quote too, so a URL's :// only makes its line hot
+        # and never triggers a scan of the whole text.
+        # Only the first character is consumed, the rest is checked by lookbehind/lookahead, so the
+        # scan skips quickly to candidate characters and overlapping anchors cannot hide each other
+        self.anchor_pattern = re.compile(
+            r'[:/\\.@mhs](?:(?P<drive>(?<=["\'][A-Za-z]:)(?=[/\\]))|(?P<unc>(?<=["\'][/\\])(?=[/\\]))|(?P<hkey>(?<=h)(?=key_))'
+            r'|(?P<line>(?<=\.)(?=tk|ml|ga|cf|top|click|download|security|update|onion|com|net|org|io|dev|ai|xyz'
+            r'|exe|dll|scr|bat|cmd|pif|vbs|js|jar|zip|rar|7z|php|ps1|sh)'
+            r'|(?<=:)(?=[/\\])|(?<=@)(?=openssh\.com)|(?<=m)(?=ain)|(?<=s)(?=sh(?:client|connection|session))))',
+            re.IGNORECASE
+        )
+        # patterns whose matches never contain a newline, run on the anchored lines only
+        self.line_patterns = [('paths', None, self.windows_path_patterns[1])] + \
+                             [('iocs', category, pattern) for category, pattern in self.ioc_patterns.items()]
+        # patterns that can run across lines, run on the whole text once their anchor shows up
+        self.text_patterns = {'drive': self.windows_path_patterns[0], 'unc': self.windows_path_patterns[2],
+                              'hkey': self.windows_path_patterns[3]}
+        
         self.bad_string_patterns = {'...', '%s', '%a', '%d', '%c'}
         self.bad_endings = ['...', '@"', "@'", '"', "'"]
         self.format_prefixes = ('%s', '%a', '%d')
 
     def load_lib(self) -> Set[str]:
-        lib_file = "asm_footprint_sniffer_lib.txt"
+        lib_file = self.LIB_FILE
         lib = set()
         
         try:
             if Path(lib_file).exists():
                 with open(lib_file, 'r', encoding='utf-8') as f:
                     lib = {line.strip().lower() for line in f if line.strip() and not line.startswith(('#', '==='))}
-                print(f"loaded {len(lib)} lib entries from {lib_file}")
-            else:
+                if self.verbose:
+                    print(f"loaded {len(lib)} lib entries from {lib_file}")
+            elif self.verbose:
                 print(f"Info: lib file '{lib_file}' not found, running without lib")
         except Exception as e:
             print(f"Warning: error loading lib file '{lib_file}': {e}")
@@ -100,10 +149,9 @@ class IoCScanner:
         return lib
         
     def is_libed(self, text: str) -> bool:
-        if not self.lib:
+        if not self.lib_matcher:
             return False
-        text_lower = text.lower()
-        return any(term in text_lower for term in self.lib)
+        return self.lib_matcher.search(text.lower())
         
     def extract_ida_metadata(self, content: str) -> Dict:
         file_hashes = {}
@@ -147,6 +195,73 @@ class IoCScanner:
                  (path.count('\\') >= 2 or path.count('/') >= 2)) or
                 path.upper().startswith('HKEY_'))
     
+    def match_all(self, content: str) -> Dict[str, Set[str]]:
+        return self.filter_candidates(self.match_candidates(content))
+    
+    def match_candidates(self, content: str, found: Optional[Dict[str, Set[str]]] = None) -> Dict[str, Set[str]]:
+        """Same matches as extract_windows_paths plus a finditer per ioc_patterns entry, from one scan.
+        
+        anchor_pattern finds every line holding a literal some pattern needs (://, .com, main, ...).
+        Patterns that never match across a newline then only run on those lines, joined by newlines,
+        which gives the same matches as on the whole text. Path patterns that can span lines only run
+        (on the whole text) when their anchor was seen.
+        IoC matches are returned before is_valid_ioc (which depends on the lib), see filter_candidates.
+        Matches are added to found when it is given.
+        """
+        found = self.empty_found() if found is None else found
+        hot_lines, triggered = self.anchored_lines(content)
+        for name, pattern in self.text_patterns.items():
+            if name in triggered:
+                self.collect('paths', None, pattern.finditer(content), found)
+        self.collect_line_matches(hot_lines, found)
+        return found
+    
+    def empty_found(self) -> Dict[str, Set[str]]:
+        found = {'dependency_paths': set(), 'operational_files': set()}
+        found.update((category, set()) for category in self.ioc_patterns)
+        return found
+    
+    def anchored_lines(self, content: str):
+        lines = {}
+        triggered = set()
+        for anchor in self.anchor_pattern.finditer(content):
+            triggered.add(anchor.lastgroup)
+            start = content.rfind('\n', 0, anchor.start()) + 1
+            if start not in lines:
+                end = content.find('\n', anchor.end())
+                lines[start] = end if end != -1 else len(content)
+        return '\n'.join(content[start:end] for start, end in sorted(lines.items())), triggered
+    
+    def collect_line_matches(self, hot_lines: str, found: Dict[str, Set[str]]):
+        if hot_lines:
+            for kind, category, pattern in self.line_patterns:
+                self.collect(kind, category, pattern.finditer(hot_lines), found)
+    
+    # send matches of one pattern to their category; paths are checked here, IoCs by filter_candidates
+    def collect(self, kind: str, category: Optional[str], matches, found: Dict[str, Set[str]]):
+        for match in matches:
+            if kind == 'paths':
+                cleaned_path = match.group(1).strip().strip('"\'')
+                if self.is_valid_windows_path(cleaned_path):
+                    if self.path_validation['dependency'].search(cleaned_path.lower()):
+                        found['dependency_paths'].add(cleaned_path)
+                    else:
+                        found['operational_files'].add(cleaned_path)
+            else:
+                found[category].add(match.group().strip().strip('"\''))
+    
+    def filter_candidates(self, candidates: Dict[str, Set[str]]) -> Dict[str, Set[str]]:
+        return {category: matches if category in ('dependency_paths', 'operational_files')
+                else {text for text in matches if self.is_valid_ioc(text, category)}
+                for category, matches in candidates.items()}
+    
+    def candidate_version(self) -> str:
+        # changes whenever a pattern that decides the candidates of a listing changes
+        patterns = [self.STORE_FORMAT, self.ida_patterns, self.ida_exclude_pattern, self.string_pattern, self.ioc_patterns,
+                    self.windows_path_patterns, self.path_validation, sorted(self.bad_string_patterns)]
+        encoded = json.dumps(patterns, default=lambda pattern: [pattern.pattern, pattern.flags])
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+    
     def is_valid_ioc(self, text: str, category: str) -> bool:
         if len(text) < 3 or '...' in text or any(text.endswith(bad) for bad in self.bad_endings):
             return False
@@ -170,84 +285,233 @@ class IoCScanner:
         try:
             result = {'file': filename}
             
-            ida_metadata = self.extract_ida_metadata(content)
+            ida_metadata, candidates = self.content_candidates(content)
             if ida_metadata:
                 result.update(ida_metadata)
             
-            cleaned_content = self.clean_content(content)
-            strings = self.extract_strings(cleaned_content)
-            full_content = f"{cleaned_content}\n{chr(10).join(strings)}"
-            
-            all_found_iocs = {}
-            
-            windows_paths = self.extract_windows_paths(full_content)
-            for path_type, paths in windows_paths.items():
-                if paths:
-                    all_found_iocs[path_type] = sorted(paths)
-                    
-            for category, pattern in self.ioc_patterns.items():
-                matches = set()
-                for match in pattern.finditer(full_content):
-                    text = match.group().strip().strip('"\'')
-                    if self.is_valid_ioc(text, category):
-                        matches.add(text)
-                        
-                if matches:
-                    all_found_iocs[category] = sorted(matches)
-            
-            if all_found_iocs:
-                result['iocs'] = {category: all_found_iocs[category] 
-                                for category in self.IOC_CATEGORY_ORDER 
-                                if category in all_found_iocs}
-            
-            return result if len(result) > 1 else None
+            return self.build_result(result, self.filter_candidates(candidates))
             
         except Exception as e:
             return {'file': filename, 'error': str(e)}
     
+    def content_candidates(self, content: str):
+        ida_metadata = self.extract_ida_metadata(content)
+        
+        # the listing and its extracted strings are scanned one after the other, not joined into one copy
+        cleaned_content = self.clean_content(content)
+        found = self.match_candidates(cleaned_content)
+        self.match_candidates('\n'.join(self.extract_strings(cleaned_content)), found)
+        
+        return ida_metadata, found
+    
+    def build_result(self, result: Dict, found: Dict[str, Set[str]]) -> Optional[Dict]:
+        all_found_iocs = {category: sorted(matches) for category, matches in found.items() if matches}
+        
+        if all_found_iocs:
+            result['iocs'] = {category: all_found_iocs[category] 
+                            for category in self.IOC_CATEGORY_ORDER 
+                            if category in all_found_iocs}
+        
+        return result if len(result) > 1 else None
+    
+    def stream_candidates(self, filepath: Path):
+        """content_candidates for listings too big for memory: the file is read chunk_size characters at a time.
+        
+        1. chunks are cut after their last newline, so excluded IDA lines and line-bound patterns see whole lines
+        2. hashes are taken from the first chunk (the IDA header) only
+        3. strings and path patterns that can span lines run through WindowedMatcher, which holds back the
+           end of each chunk so a match crossing into the next chunk is found whole
+        4. extracted strings are scanned as they come instead of being appended after the whole file
+        results match scan_file unless a path match is longer than overlap characters
+        """
+        ida_metadata = {}
+        found = self.empty_found()
+        strings_matcher = WindowedMatcher(self.string_pattern, 256)
+        path_matchers = {name: WindowedMatcher(pattern, self.overlap) for name, pattern in self.text_patterns.items()}
+        strings_path_matchers = {name: WindowedMatcher(pattern, self.overlap) for name, pattern in self.text_patterns.items()}
+        carry, first = '', True
+        
+        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+            while True:
+                block = f.read(self.chunk_size)
+                final = not block
+                text = carry + block
+                cut = len(text) if final else (text.rfind('\n') + 1 or len(text))
+                text, carry = text[:cut], text[cut:]
+                
+                if first:
+                    ida_metadata = self.extract_ida_metadata(text)
+                    first = False
+                
+                cleaned = self.clean_content(text)
+                hot_lines, triggered = self.anchored_lines(cleaned)
+                self.collect_line_matches(hot_lines, found)
+                for name, matcher in path_matchers.items():
+                    self.collect('paths', None, matcher.feed(cleaned, final, name in triggered), found)
+                
+                strings = [match.group(1).strip() for match in strings_matcher.feed(cleaned, final)]
+                strings = '\n'.join(string for string in strings if not any(bad in string for bad in self.bad_string_patterns))
+                hot_lines, triggered = self.anchored_lines(strings)
+                self.collect_line_matches(hot_lines, found)
+                strings = '\n' + strings if strings else ''
+                for name, matcher in strings_path_matchers.items():
+                    self.collect('paths', None, matcher.feed(strings, final, name in triggered), found)
+                
+                if final:
+                    break
+        
+        return ida_metadata, found
+    
+    def file_candidates(self, filepath: Path):
+        if self.chunk_size:
+            return self.stream_candidates(filepath)
+        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+        return self.content_candidates(content)
+    
     def scan_file(self, filepath: Path) -> Optional[Dict]:
         try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            return self.scan_content(content, str(filepath))
+            sha256 = self.header_sha256(filepath) if self.store else None
+            if sha256:
+                return self.scan_stored(filepath, sha256)
+            ida_metadata, candidates = self.file_candidates(filepath)
+            return self.build_result({'file': str(filepath), **ida_metadata}, self.filter_candidates(candidates))
         except Exception as e:
             return {'file': str(filepath), 'error': str(e)}
     
-    def scan_directory(self, directory: Path, recursive: bool = True) -> List[Dict]:
+    def header_sha256(self, filepath: Path) -> Optional[str]:
+        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+            header = f.read(self.HEADER_SIZE)
+        return self.extract_ida_metadata(header).get('file_hashes', {}).get('sha256')
+    
+    def scan_stored(self, filepath: Path, sha256: str) -> Optional[Dict]:
+        # unchanged sample and lib: stored entry; lib changed: stored candidates filtered again; new sample: full scan
+        entry = self.store.get(sha256)
+        if entry is None:
+            ida_metadata, candidates = self.file_candidates(filepath)
+            self.store.put(sha256, ida_metadata, candidates)
+            lib = None
+        else:
+            ida_metadata, candidates, lib, iocs = entry
+        
+        if lib == self.store.lib:
+            result = {'file': str(filepath), **ida_metadata}
+            if iocs:
+                result['iocs'] = iocs
+            return result if len(result) > 1 else None
+        
+        result = self.build_result({'file': str(filepath), **ida_metadata}, self.filter_candidates(candidates))
+        self.store.put_result(sha256, result.get('iocs') if result else None)
+        return result
+    
+    def scan_file_with_timeout(self, filepath: Path, timeout: Optional[float] = None) -> Optional[Dict]:
+        if not timeout:
+            return self.scan_file(filepath)
+        return next(self.scan_in_workers([filepath], 1, timeout))[1]
+    
+    @staticmethod
+    def init_worker(chunk_size: Optional[int] = None, store: Optional[str] = None):
+        IoCScanner.worker = IoCScanner(verbose=False, chunk_size=chunk_size, store=store)
+    
+    @staticmethod
+    def scan_in_worker(filepath: Path) -> Optional[Dict]:
+        return IoCScanner.worker.scan_file(filepath)
+    
+    def scan_in_pool(self, files: List[Path], jobs: int) -> Iterator[tuple]:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=IoCScanner.init_worker, initargs=(self.chunk_size, self.store_path)) as pool:
+            futures = {pool.submit(IoCScanner.scan_in_worker, filepath): i for i, filepath in enumerate(files)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    yield i, future.result()
+                except Exception as e:
+                    yield i, {'file': str(files[i]), 'error': f"worker failed: {e}"}
+    
+    def scan_in_workers(self, files: List[Path], jobs: int, timeout: float) -> Iterator[tuple]:
+        # (index, result) as files finish; a file still running at its deadline has its worker killed and replaced
+        workers = [ScanWorker(self.chunk_size, self.store_path) for _ in range(min(jobs, len(files)))]
+        pending = iter(enumerate(files))
+        idle, busy = list(workers), {}
+        try:
+            while True:
+                while idle:
+                    item = next(pending, None)
+                    if item is None:
+                        break
+                    worker = idle.pop()
+                    worker.submit(*item, timeout)
+                    busy[worker.conn] = worker
+                if not busy:
+                    return
+                
+                wait = min(worker.deadline for worker in busy.values()) - time.monotonic()
+                for conn in multiprocessing.connection.wait(list(busy), max(wait, 0)):
+                    worker = busy.pop(conn)
+                    idle.append(worker)
+                    yield worker.index, worker.result()
+                now = time.monotonic()
+                for conn, worker in list(busy.items()):
+                    if worker.deadline <= now:
+                        del busy[conn]
+                        idle.append(worker)
+                        yield worker.index, worker.kill(timeout)
+        finally:
+            for worker in workers:
+                worker.close()
+    
+    def scan_directory(self, directory: Path, recursive: bool = True, jobs: int = 1, timeout: Optional[float] = None) -> List[Dict]:
+        return list(self.iter_scan_directory(directory, recursive, jobs, timeout))
+    
+    def iter_scan_directory(self, directory: Path, recursive: bool = True, jobs: int = 1,
+                            timeout: Optional[float] = None) -> Iterator[Dict]:
+        # results in sorted path order, each one as soon as it and every file before it are scanned
         pattern = "**/*.asm" if recursive else "*.asm"
-        files = list(directory.glob(pattern))
+        files = sorted(directory.glob(pattern))
         
         if not files:
             print(f"no .asm files found in {directory}")
-            return []
+            return
             
-        print(f"scanning {len(files)} files...")
-        results = []
+        print(f"scanning {len(files)} files" + (f" with {jobs} workers..." if jobs > 1 else "..."))
+        progress = ScanProgress(len(files))
         
-        for i, filepath in enumerate(files, 1):
-            if i % 25 == 0:
-                print(f"Progress: {i}/{len(files)} files processed")
-                
-            result = self.scan_file(filepath)
-            if result:
-                results.append(result)
-                
-        return results
+        if timeout:
+            completed = self.scan_in_workers(files, jobs, timeout)
+        elif jobs > 1:
+            completed = self.scan_in_pool(files, jobs)
+        else:
+            completed = ((i, self.scan_file(filepath)) for i, filepath in enumerate(files))
+        
+        # results finished ahead of an earlier file wait here
+        waiting = {}
+        following = 0
+        for i, result in completed:
+            waiting[i] = result
+            progress.update(files[i])
+            while following in waiting:
+                result = waiting.pop(following)
+                following += 1
+                if result:
+                    yield result
+        
+        progress.finish()
     
     def generate_report(self, results: List[Dict], format_type: str = 'text') -> str:
-        if format_type == 'json':
-            return json.dumps(results, indent=2)
+        return ''.join(self.render_report(results, format_type))
+    
+    def render_report(self, results: Iterable[Dict], format_type: str = 'text') -> Iterator[str]:
+        """generate_report in pieces, for writing a report as it is built.
         
-        total_files = len(results)
-        files_with_iocs = sum(1 for r in results if r.get('iocs'))
-        files_with_hashes = sum(1 for r in results if r.get('file_hashes'))
-        files_with_errors = sum(1 for r in results if r.get('error'))
+        results can be a list or a ResultStream read back from a JSONL report; text reports go over
+        them twice (summary, then details), so only one result is held at a time either way
+        """
+        if format_type == 'json':
+            yield from self.render_json(results)
+            return
         
-        category_counts = {}
+        summary = ReportSummary()
         for result in results:
-            if result.get('iocs'):
-                for category, iocs in result['iocs'].items():
-                    category_counts[category] = category_counts.get(category, 0) + len(iocs)
+            summary.add(result)
         
         report = [
             "=" * 80,
@@ -256,54 +520,566 @@ class IoCScanner:
             "",
             "SUMMARY",
             "-" * 40,
-            f"Total Files Processed: {total_files}",
-            f"Files with IoCs: {files_with_iocs}",
-            f"Files with Hashes: {files_with_hashes}",
-            f"Files with Errors: {files_with_errors}",
+            f"Total Files Processed: {summary.total_files}",
+            f"Files with IoCs: {summary.files_with_iocs}",
+            f"Files with Hashes: {summary.files_with_hashes}",
+            f"Files with Errors: {summary.files_with_errors}",
             ""
         ]
         
-        if category_counts:
+        if summary.category_counts:
             report.extend(["IoC CATEGORIES", "-" * 40])
             for category in self.IOC_CATEGORY_ORDER:
-                if category in category_counts:
-                    report.append(f"{self.CATEGORY_NAMES[category]}: {category_counts[category]}")
+                if category in summary.category_counts:
+                    report.append(f"{self.CATEGORY_NAMES[category]}: {summary.category_counts[category]}")
             report.append("")
         
         report.extend(["DETAILED RESULTS", "=" * 80])
+        yield '\n'.join(report)
         
         for result in results:
-            if result.get('error'):
-                report.extend([f"ERROR - {result['file']}", f"  Error: {result['error']}", ""])
-                continue
-                
-            report.extend([f"File: {result['file']}", "-" * 60])
-                
-            if result.get('file_hashes'):
-                report.append("File Hashes:")
-                for hash_type, hash_value in result['file_hashes'].items():
-                    report.append(f"{hash_type.upper()}: {hash_value}")
-                report.append("")
-                
-            if result.get('iocs'):
-                for category in self.IOC_CATEGORY_ORDER:
-                    if category in result['iocs']:
-                        report.append(f"{self.CATEGORY_NAMES[category]}:")
-                        for ioc in result['iocs'][category]:
-                            report.append(f"{ioc}")
-                        report.append("")
+            yield '\n' + '\n'.join(self.render_text_result(result))
+    
+    def render_text_result(self, result: Dict) -> List[str]:
+        if result.get('error'):
+            return [f"ERROR - {result['file']}", f"  Error: {result['error']}", ""]
+        
+        report = [f"File: {result['file']}", "-" * 60]
             
+        if result.get('file_hashes'):
+            report.append("File Hashes:")
+            for hash_type, hash_value in result['file_hashes'].items():
+                report.append(f"{hash_type.upper()}: {hash_value}")
             report.append("")
             
-        return '\n'.join(report)
+        if result.get('iocs'):
+            for category in self.IOC_CATEGORY_ORDER:
+                if category in result['iocs']:
+                    report.append(f"{self.CATEGORY_NAMES[category]}:")
+                    for ioc in result['iocs'][category]:
+                        report.append(f"{ioc}")
+                    report.append("")
+        
+        report.append("")
+        return report
+    
+    @staticmethod
+    def render_json(results: Iterable[Dict]) -> Iterator[str]:
+        # same text as json.dumps(results, indent=2), one result at a time
+        empty = True
+        for result in results:
+            yield ('[\n' if empty else ',\n') + '\n'.join('  ' + line for line in json.dumps(result, indent=2).split('\n'))
+            empty = False
+        yield '[]' if empty else '\n]'
+
+
+class ScanStore:
+    """
+    1. one sqlite file, a row per sample SHA256 (Input SHA256 of the IDA header) and candidate version
+    2. the row keeps the hashes and the candidates of the sample (matches before the lib and is_valid_ioc),
+       plus the IoCs they gave with the lib they were last filtered with
+    3. same lib: the stored IoCs are served; other lib: the stored candidates are filtered again, the .asm is not read
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS samples (sha256 TEXT NOT NULL, version TEXT NOT NULL, metadata TEXT NOT NULL,
+            candidates BLOB NOT NULL, lib TEXT, iocs TEXT, PRIMARY KEY (sha256, version));
+    """
+    
+    def __init__(self, path: str, version: str, lib: str):
+        # --jobs workers share one store, writers wait for each other
+        self.db = sqlite3.connect(path, timeout=300)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(ScanStore.SCHEMA)
+        self.version = version
+        self.lib = lib
+    
+    def get(self, sha256: str):
+        row = self.db.execute("SELECT metadata, candidates, lib, iocs FROM samples WHERE sha256 = ? AND version = ?",
+                              (sha256, self.version)).fetchone()
+        if row is None:
+            return None
+        candidates = json.loads(zlib.decompress(row[1]).decode('utf-8'))
+        return (json.loads(row[0]), {category: set(matches) for category, matches in candidates.items()},
+                row[2], json.loads(row[3]) if row[3] else None)
+    
+    def put(self, sha256: str, metadata: Dict, candidates: Dict[str, Set[str]]):
+        encoded = json.dumps({category: sorted(matches) for category, matches in candidates.items()})
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO samples VALUES (?, ?, ?, ?, NULL, NULL)",
+                            (sha256, self.version, json.dumps(metadata), zlib.compress(encoded.encode('utf-8'))))
+    
+    def put_result(self, sha256: str, iocs: Optional[Dict]):
+        with self.db:
+            self.db.execute("UPDATE samples SET lib = ?, iocs = ? WHERE sha256 = ? AND version = ?",
+                            (self.lib, json.dumps(iocs) if iocs else None, sha256, self.version))
+
+
+class IoCIndex:
+    """
+    1. one sqlite file for a whole corpus: IoC value -> (category, sample SHA256, file) postings
+    2. a sample is its Input SHA256 (its file path when the listing has none); adding it again replaces its postings
+    3. values are indexed lowercased and reversed, so exact, prefix (C:\\work\\*) and suffix (*.onion) lookups are
+       index range scans; a pattern with * on both ends (*evil*) has to read every value
+    4. postings are also indexed by sample, for the IoCs sharing samples with a given one (related)
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS samples (id INTEGER PRIMARY KEY, key TEXT NOT NULL UNIQUE, sha256 TEXT, file TEXT NOT NULL);
+        CREATE TABLE IF NOT EXISTS iocs (id INTEGER PRIMARY KEY, value TEXT NOT NULL UNIQUE, key TEXT NOT NULL, reversed TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS iocs_key ON iocs (key);
+        CREATE INDEX IF NOT EXISTS iocs_reversed ON iocs (reversed);
+        CREATE TABLE IF NOT EXISTS postings (ioc INTEGER NOT NULL, category TEXT NOT NULL, sample INTEGER NOT NULL,
+            PRIMARY KEY (ioc, category, sample)) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS postings_sample ON postings (sample, ioc);
+    """
+    
+    def __init__(self, path: str):
+        self.db = sqlite3.connect(path, timeout=300)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(IoCIndex.SCHEMA)
+    
+    def close(self):
+        self.db.close()
+    
+    # results as made by scan_file / found in a JSON report; returns the number of postings added
+    def add(self, results: List[Dict]) -> int:
+        count = 0
+        with self.db:
+            for result in results:
+                if not result.get('iocs'):
+                    continue
+                sha256 = result.get('file_hashes', {}).get('sha256')
+                key = sha256 or f"file:{result['file']}"
+                self.db.execute("INSERT INTO samples (key, sha256, file) VALUES (?, ?, ?) "
+                                "ON CONFLICT (key) DO UPDATE SET file = excluded.file", (key, sha256, result['file']))
+                sample = self.db.execute("SELECT id FROM samples WHERE key = ?", (key,)).fetchone()[0]
+                self.db.execute("DELETE FROM postings WHERE sample = ?", (sample,))
+                
+                for category, values in result['iocs'].items():
+                    self.db.executemany("INSERT OR IGNORE INTO iocs (value, key, reversed) VALUES (?, ?, ?)",
+                                        ((value, value.lower(), value.lower()[::-1]) for value in values))
+                    self.db.executemany("INSERT OR IGNORE INTO postings SELECT id, ?, ? FROM iocs WHERE value = ?",
+                                        ((category, sample, value) for value in values))
+                    count += len(values)
+        return count
+    
+    @staticmethod
+    def key_range(prefix: str):
+        # every text starting with prefix sorts in [prefix, prefix with its last character incremented)
+        return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    
+    # SQL condition and arguments selecting the rows of table iocs a pattern (value, prefix*, *suffix or *part*)
+    # matches, and the indexed column the rows come out ordered by
+    def condition(self, pattern: str, table: str = 'iocs'):
+        key = pattern.lower()
+        if len(key) > 2 and key.startswith('*') and key.endswith('*'):
+            return f"instr({table}.key, ?) > 0", (key[1:-1],), f"{table}.key"
+        if len(key) > 1 and key.endswith('*'):
+            return f"{table}.key >= ? AND {table}.key < ?", self.key_range(key[:-1]), f"{table}.key"
+        if len(key) > 1 and key.startswith('*'):
+            return f"{table}.reversed >= ? AND {table}.reversed < ?", self.key_range(key[:0:-1]), f"{table}.reversed"
+        return f"{table}.key = ?", (key,), f"{table}.key"
+    
+    def is_rare(self, pattern: str, threshold: int = 1000) -> bool:
+        condition, arguments, _ = self.condition(pattern)
+        sql = f"SELECT COUNT(*) FROM (SELECT 1 FROM iocs WHERE {condition} LIMIT {threshold})"
+        return self.db.execute(sql, arguments).fetchone()[0] < threshold
+    
+    # (value, category, sha256, file) of every posting matching pattern, in samples matching all the other patterns too
+    def query(self, patterns: List[str], category: Optional[str] = None, limit: Optional[int] = None) -> List[tuple]:
+        condition, arguments, order = self.condition(patterns[0])
+        sql = ("SELECT iocs.value, postings.category, samples.sha256, samples.file FROM iocs "
+               "JOIN postings ON postings.ioc = iocs.id JOIN samples ON samples.id = postings.sample WHERE " + condition)
+        arguments = list(arguments)
+        if category:
+            sql += " AND postings.category = ?"
+            arguments.append(category)
+        # a rare pattern gives the list of its samples up front, a common one is checked per row through the
+        # IoCs of the row's sample, so neither a rare nor a common pattern in any position makes the query slow
+        for pattern in patterns[1:]:
+            other, other_arguments, _ = self.condition(pattern, 'other')
+            if self.is_rare(pattern):
+                sql += (" AND postings.sample IN (SELECT together.sample FROM postings AS together "
+                        "JOIN iocs AS other ON other.id = together.ioc WHERE " + other + ")")
+            else:
+                sql += (" AND EXISTS (SELECT 1 FROM postings AS together JOIN iocs AS other ON other.id = together.ioc "
+                        "WHERE together.sample = postings.sample AND " + other + ")")
+            arguments.extend(other_arguments)
+        # in index order, so a --limit query stops after limit rows instead of sorting every match
+        sql += f" ORDER BY {order}, iocs.value, samples.file"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self.db.execute(sql, arguments).fetchall()
+    
+    # (samples in common, value, category) of the IoCs found in the samples holding a match of pattern
+    def related(self, pattern: str, category: Optional[str] = None, limit: int = 20) -> List[tuple]:
+        condition, arguments, _ = self.condition(pattern)
+        sql = ("WITH matched AS (SELECT iocs.id FROM iocs WHERE " + condition + "), "
+               "hits AS (SELECT DISTINCT postings.sample FROM postings WHERE postings.ioc IN matched) "
+               "SELECT COUNT(DISTINCT other.sample) AS shared, iocs.value, other.category FROM hits "
+               "JOIN postings AS other ON other.sample = hits.sample JOIN iocs ON iocs.id = other.ioc "
+               "WHERE other.ioc NOT IN matched")
+        arguments = list(arguments)
+        if category:
+            sql += " AND other.category = ?"
+            arguments.append(category)
+        sql += " GROUP BY other.ioc, other.category ORDER BY shared DESC, iocs.value LIMIT ?"
+        arguments.append(limit)
+        return self.db.execute(sql, arguments).fetchall()
+
+
+class WindowedMatcher:
+    # finditer over a text that arrives in pieces: a match is only reported once it starts at least
+    # max_length characters before the end of what has arrived, so no piece boundary can cut it;
+    # the unreported end is kept and scanned again with the next piece.
+    # run=False says the piece holds no anchor for the pattern; it is still scanned until max_length
+    # characters have arrived after the last anchor, as a match around that anchor may still be held back
+    def __init__(self, pattern, max_length: int):
+        self.pattern = pattern
+        self.max_length = max_length
+        self.tail = ''
+        self.cooldown = 0
+    
+    def feed(self, text: str, final: bool = False, run: bool = True):
+        window = self.tail + text
+        if run:
+            self.cooldown = self.max_length
+        else:
+            run = self.cooldown > 0
+            self.cooldown -= len(text)
+        if not run:
+            # nothing can start here, keep only what a match starting next time could need
+            self.tail = '' if final else window[-self.max_length:]
+            return
+        
+        limit = len(window) if final else len(window) - self.max_length
+        resume = 0
+        for match in self.pattern.finditer(window):
+            if match.start() > limit:
+                break
+            resume = match.end()
+            yield match
+        self.tail = '' if final else window[max(resume, limit + 1):]
+
+
+class LibAutomaton:
+    """Aho-Corasick automaton over the lib terms: search(text) is True exactly when some term is a substring of text.
+    
+    1. goto maps state << 21 | ord(char) to the child state in the trie of the terms, state 0 is the root
+    2. fail[state] is the state of the longest proper suffix of the state's prefix that is also in the trie
+    3. hit[state] is set when a term ends at the state or at any state on its fail chain
+    one pass over the text whatever the number of terms. The tables are cached as flat arrays next to the
+    lib (a dict is rebuilt from them in one zip) and rebuilt when the set of terms changes
+    """
+    VERSION = 1
+    
+    def __init__(self, terms: Set[str] = ()):
+        self.goto = {}
+        children = [[]]
+        hit = [False]
+        for term in terms:
+            state = 0
+            for char in term:
+                key = state << 21 | ord(char)
+                child = self.goto.get(key)
+                if child is None:
+                    child = len(children)
+                    self.goto[key] = child
+                    children[state].append((ord(char), child))
+                    children.append([])
+                    hit.append(False)
+                state = child
+            hit[state] = True
+        
+        self.fail = [0] * len(children)
+        queue = [child for _, child in children[0]]
+        for state in queue:
+            for code, child in children[state]:
+                fallback = self.fail[state]
+                while fallback and fallback << 21 | code not in self.goto:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto.get(fallback << 21 | code, 0)
+                hit[child] = hit[child] or hit[self.fail[child]]
+                queue.append(child)
+        self.hit = bytes(hit)
+    
+    @staticmethod
+    def digest(terms: Set[str]) -> str:
+        return hashlib.sha256('\n'.join(sorted(terms)).encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def cached(cls, terms: Set[str], cache_file: str) -> 'LibAutomaton':
+        digest = cls.digest(terms)
+        try:
+            with open(cache_file, 'rb') as f:
+                version, cached_digest, keys, targets, fail, hit = marshal.load(f)
+            if version == cls.VERSION and cached_digest == digest:
+                automaton = cls()
+                automaton.goto = dict(zip(array('q', keys), array('q', targets)))
+                automaton.fail = array('q', fail).tolist()
+                automaton.hit = hit
+                return automaton
+        except (OSError, ValueError, EOFError, TypeError):
+            pass
+        
+        automaton = cls(terms)
+        # written aside and renamed, so a crash or a concurrent run never leaves a truncated cache behind
+        temp_file = Path(f"{cache_file}.{os.getpid()}.tmp")
+        try:
+            with open(temp_file, 'wb') as f:
+                marshal.dump((cls.VERSION, digest, array('q', automaton.goto.keys()).tobytes(),
+                              array('q', automaton.goto.values()).tobytes(), array('q', automaton.fail).tobytes(),
+                              automaton.hit), f)
+            os.replace(temp_file, cache_file)
+        except OSError:
+            with contextlib.suppress(OSError):
+                temp_file.unlink()
+        return automaton
+    
+    def search(self, text: str) -> bool:
+        goto, fail, hit = self.goto, self.fail, self.hit
+        state = 0
+        for char in text:
+            code = ord(char)
+            while state and state << 21 | code not in goto:
+                state = fail[state]
+            state = goto.get(state << 21 | code, 0)
+            if hit[state]:
+                return True
+        return False
+
+
+class ScanWorker:
+    """
+    1. a scanning process fed one file at a time over a pipe, its IoCScanner built once at start
+    2. the parent keeps the deadline of the file in progress and kills the process when it passes:
+       a signal cannot stop one long re call, which never returns to the interpreter
+    3. a killed or crashed worker is replaced by a fresh process, the file is reported as an error
+    """
+    def __init__(self, chunk_size: Optional[int] = None, store: Optional[str] = None):
+        self.args = (chunk_size, store)
+        self.index = self.filepath = self.deadline = None
+        self.start()
+    
+    def start(self):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=ScanWorker.serve, args=(child, *self.args), daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+    
+    @staticmethod
+    def serve(conn, chunk_size: Optional[int], store: Optional[str]):
+        IoCScanner.init_worker(chunk_size, store)
+        conn.send(None)
+        while True:
+            filepath = conn.recv()
+            if filepath is None:
+                break
+            conn.send(IoCScanner.worker.scan_file(filepath))
+    
+    def submit(self, index: int, filepath: Path, timeout: float):
+        # the deadline starts once the worker has loaded its patterns and lib
+        if not self.ready:
+            try:
+                self.conn.recv()
+            except EOFError:
+                raise RuntimeError("scan worker exited while starting") from None
+            self.ready = True
+        self.index, self.filepath = index, filepath
+        self.deadline = time.monotonic() + timeout
+        self.conn.send(filepath)
+    
+    def result(self) -> Optional[Dict]:
+        try:
+            return self.conn.recv()
+        except (EOFError, OSError):
+            self.restart()
+            return {'file': str(self.filepath), 'error': "worker failed: the scanning process exited"}
+    
+    def kill(self, timeout: float) -> Dict:
+        self.restart()
+        return {'file': str(self.filepath), 'error': f"timed out after {timeout}s"}
+    
+    def restart(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.start()
+    
+    def close(self):
+        with contextlib.suppress(OSError):
+            self.conn.send(None)
+        self.process.join(1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ScanProgress:
+    # files/s and MB/s so far, printed every 25 files or every 2 seconds
+    def __init__(self, total: int, interval: float = 2.0):
+        self.total = total
+        self.interval = interval
+        self.done = 0
+        self.bytes = 0
+        self.started = self.last = time.perf_counter()
+    
+    def update(self, filepath: Path):
+        self.done += 1
+        try:
+            self.bytes += filepath.stat().st_size
+        except OSError:
+            pass
+        now = time.perf_counter()
+        if self.done % 25 == 0 or now - self.last >= self.interval:
+            self.last = now
+            print(f"Progress: {self.done}/{self.total} files processed ({self.rate(now)})")
+    
+    def rate(self, now: float) -> str:
+        elapsed = max(now - self.started, 1e-9)
+        return f"{self.done / elapsed:.1f} files/s, {self.bytes / elapsed / 1024 / 1024:.1f} MB/s"
+    
+    def finish(self):
+        print(f"scanned {self.done} files in {time.perf_counter() - self.started:.1f}s ({self.rate(time.perf_counter())})")
+
+
+class ReportSummary:
+    # the SUMMARY counts of a text report, kept while results come in
+    def __init__(self):
+        self.total_files = 0
+        self.files_with_iocs = 0
+        self.files_with_hashes = 0
+        self.files_with_errors = 0
+        self.category_counts = {}
+    
+    def add(self, result: Dict):
+        self.total_files += 1
+        self.files_with_iocs += bool(result.get('iocs'))
+        self.files_with_hashes += bool(result.get('file_hashes'))
+        self.files_with_errors += bool(result.get('error'))
+        for category, iocs in (result.get('iocs') or {}).items():
+            self.category_counts[category] = self.category_counts.get(category, 0) + len(iocs)
+    
+    def to_dict(self) -> Dict:
+        return {'total_files': self.total_files, 'files_with_iocs': self.files_with_iocs,
+                'files_with_hashes': self.files_with_hashes, 'files_with_errors': self.files_with_errors,
+                'categories': self.category_counts}
+
+
+class JsonlWriter:
+    """-f jsonl: one line per result, written and flushed as soon as the result is in, then a last
+    {"summary": {...}} line with the counts of the whole run. ResultStream reads it back"""
+    def __init__(self, out):
+        self.out = out
+        self.summary = ReportSummary()
+    
+    def write(self, result: Dict):
+        self.summary.add(result)
+        self.out.write(json.dumps(result) + '\n')
+        self.out.flush()
+    
+    def close(self):
+        self.out.write(json.dumps({'summary': self.summary.to_dict()}) + '\n')
+        self.out.flush()
+
+
+class ResultStream:
+    # the results of a JSONL report; every iteration reads the file again, so memory stays one result
+    def __init__(self, path: str):
+        self.path = path
+    
+    def __iter__(self) -> Iterator[Dict]:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    if 'summary' not in record:
+                        yield record
+
+
+def render_main(argv):
+    parser = argparse.ArgumentParser(prog="asm_footprint_sniffer.py render")
+    parser.add_argument('stream', help='JSONL report written with -f jsonl')
+    parser.add_argument('-o', '--output', help='output file path')
+    parser.add_argument('-f', '--format', choices=['json', 'text'], default='text', help='output format (default: text)')
+    args = parser.parse_args(argv)
+    
+    if not Path(args.stream).exists():
+        print(f"Error: '{args.stream}' does not exist", file=sys.stderr)
+        sys.exit(1)
+    
+    scanner = IoCScanner(verbose=False)
+    write_report(scanner.render_report(ResultStream(args.stream), args.format), args.output)
+
+
+def write_report(pieces: Iterator[str], output: Optional[str]):
+    if not output:
+        for piece in pieces:
+            sys.stdout.write(piece)
+        sys.stdout.write('\n')
+        return
+    try:
+        with open(output, 'w', encoding='utf-8') as f:
+            for piece in pieces:
+                f.write(piece)
+        print(f"report saved to: {output}")
+    except Exception as e:
+        print(f"error writing to {output}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def index_main(argv):
+    parser = argparse.ArgumentParser(prog="asm_footprint_sniffer.py index")
+    parser.add_argument('action', choices=['add', 'query', 'related'])
+    parser.add_argument('index', help='sqlite IoC index (created on first add)')
+    parser.add_argument('targets', nargs='+',
+                        help='add: JSON reports / query: IoC patterns, all in the same sample (value, prefix*, *suffix, *part*) '
+                             '/ related: one IoC pattern')
+    parser.add_argument('-c', '--category', choices=IoCScanner.IOC_CATEGORY_ORDER, help='query/related: only this category')
+    parser.add_argument('-n', '--limit', type=int, help='query/related: number of rows to print (related default: 20)')
+    args = parser.parse_args(argv)
+    
+    if args.action != 'add' and not Path(args.index).exists():
+        print(f"Error: '{args.index}' does not exist", file=sys.stderr)
+        sys.exit(1)
+    
+    index = IoCIndex(args.index)
+    try:
+        if args.action == 'add':
+            for report in args.targets:
+                with open(report, 'r', encoding='utf-8') as f:
+                    count = index.add(json.load(f))
+                print(f"indexed {count} IoCs from {report} in {args.index}")
+        elif args.action == 'query':
+            for value, category, sha256, file in index.query(args.targets, args.category, args.limit):
+                print(f"{category}\t{value}\t{sha256 or '-'}\t{file}")
+        else:
+            for shared, value, category in index.related(args.targets[0], args.category, args.limit or 20):
+                print(f"{shared}\t{category}\t{value}")
+    finally:
+        index.close()
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'index':
+        return index_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'render':
+        return render_main(sys.argv[2:])
+    
     parser = argparse.ArgumentParser()
     parser.add_argument('path', help='path to .asm file or directory')
     parser.add_argument('-r', '--recursive', action='store_true', help='scan recursively')
     parser.add_argument('-o', '--output', help='output file path')
-    parser.add_argument('-f', '--format', choices=['json', 'text'], default='text', help='output format (default: text)')
+    parser.add_argument('-f', '--format', choices=['json', 'text', 'jsonl'], default='text',
+                        help='output format (default: text); jsonl writes each result as it is scanned, see: render')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='scan directories with N worker processes (default: 1)')
+    parser.add_argument('-t', '--timeout', type=float, help='give up on a file after this many seconds (reported as an error)')
+    parser.add_argument('--store', metavar='PATH',
+                        help='sqlite result store keyed by Input SHA256: unchanged samples are not scanned again')
+    parser.add_argument('--index', metavar='PATH', help='also add the results to this sqlite IoC index (see: index query)')
+    parser.add_argument('--stream', type=int, nargs='?', const=16, metavar='MB',
+                        help='read files in chunks of this many MB (default: 16) instead of whole, for very large listings')
     
     args = parser.parse_args()
     
@@ -312,36 +1088,61 @@ def main():
         print(f"Error: Path '{args.path}' does not exist", file=sys.stderr)
         sys.exit(1)
     
-    scanner = IoCScanner()
+    # jsonl on stdout: keep messages out of the records
+    with contextlib.redirect_stdout(sys.stderr) if args.format == 'jsonl' and not args.output else contextlib.nullcontext():
+        scanner = IoCScanner(chunk_size=args.stream * 1024 * 1024 if args.stream else None, store=args.store)
     
     if path.is_file():
         if path.suffix.lower() != '.asm':
             print(f"Error: '{args.path}' is not a .asm file", file=sys.stderr)
             sys.exit(1)
-        result = scanner.scan_file(path)
-        results = [result] if result else []
+        results = (result for result in [scanner.scan_file_with_timeout(path, args.timeout)] if result)
     elif path.is_dir():
-        results = scanner.scan_directory(path, args.recursive)
+        results = scanner.iter_scan_directory(path, args.recursive, args.jobs, args.timeout)
     else:
         print(f"Error: '{args.path}' is not a file or directory", file=sys.stderr)
         sys.exit(1)
     
+    if args.format == 'jsonl':
+        return stream_results(results, args.output, args.index)
+    
+    results = list(results)
     if not results:
         print("no IoCs found in the scanned files")
         return
     
-    report = scanner.generate_report(results, args.format)
+    if args.index:
+        index = IoCIndex(args.index)
+        print(f"indexed {index.add(results)} IoCs in {args.index}")
+        index.close()
     
-    if args.output:
-        try:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                f.write(report)
-            print(f"report saved to: {args.output}")
-        except Exception as e:
-            print(f"error writing to {args.output}: {e}", file=sys.stderr)
-            sys.exit(1)
-    else:
-        print(report)
+    write_report(scanner.render_report(results, args.format), args.output)
+
+
+def stream_results(results: Iterator[Dict], output: Optional[str], index_path: Optional[str]):
+    # -f jsonl: each result is written (and indexed) when it comes in; on stdout, progress messages go to stderr
+    index = IoCIndex(index_path) if index_path else None
+    indexed = 0
+    out = open(output, 'w', encoding='utf-8') if output else sys.stdout
+    try:
+        writer = JsonlWriter(out)
+        with contextlib.redirect_stdout(sys.stdout if output else sys.stderr):
+            for result in results:
+                writer.write(result)
+                if index:
+                    indexed += index.add([result])
+        writer.close()
+    finally:
+        if output:
+            out.close()
+        if index:
+            index.close()
+    
+    log = sys.stdout if output else sys.stderr
+    if index:
+        print(f"indexed {indexed} IoCs in {index_path}", file=log)
+    if output:
+        print(f"report saved to: {output}", file=log)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+import re
+import sys
+import time
+import random
+import shutil
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from asm_footprint_sniffer import IoCScanner  # noqa: E402
+
+FIXTURE = SCRIPT_DIR / "test_data" / "hello.asm"
+
+# pieces the fuzzed listings are made of: IoCs of every category, near misses, quotes, lib entries,
+# format strings and multi-line fragments, so matches overlap, touch and cross line ends
+FRAGMENTS = ['http://evil.tk/a/b?x=1', 'https://github.com/foo/bar', 'ftp://1.2.3.4:21/x', 'socks5://proxy.xyz:1080',
+             'ssh://root@host.net', 'hex-rays.com', 'www.golang.org/pkg', 'C:\\work\\proj\\main.exe', 'C:/Users/bob/src/app.go',
+             '\\\\server\\share\\dir\\f.dll', 'HKEY_LOCAL_MACHINE\\Software\\Run', 'HKEY_CURRENT_USER/x\ny', 'main.main',
+             'main_func1', '_mainCRTStartup', 'NewSSHClientConfig', 'curve25519-sha256@openssh.com', 'zoneinfo.zip', 'go.sh',
+             'eq.io', 'payload.ps1', '.hidden.exe', 'C:\\Program Files\\x\\y.dll', '/go/pkg/mod/golang.org/x/net@v0.1.0/a.go',
+             'C:\\build\\%s\\x.exe', 'a...b.com', 'http://%s', 'abc.onion', 'x-y.download', 'runtime.gopark', 'D:\\src\\tool.exe',
+             "'", '"', '...', '%d', 'db ', 'C:\\a\\b', 'HKEY_', 'https://', 'foo@openssh.com"', '\u00e9t\u00e9.com', '\u00c4\u00d6.exe',
+             'C:\\', 'user@OPENSSH.COM', 'FTP://UPPER.COM/x', 'sub.domain.co.ml', '1.2.3.4', 'SSHSession', '//host/share/x']
+HEADER = FIXTURE.read_text(encoding='utf-8').split('\n')[:12]
+
+
+def fuzzed_listing(seed, lines=400):
+    rng = random.Random(seed)
+    out = HEADER[:] if seed % 5 else HEADER[:5]
+    for _ in range(lines):
+        roll = rng.random()
+        if roll < 0.3:
+            out.append(f"                db '{rng.choice(FRAGMENTS)}{rng.choice(['', rng.choice(FRAGMENTS)])}',0")
+        elif roll < 0.45:
+            out.append(f"aStr{rng.randrange(999)} db \"{''.join(rng.choice(FRAGMENTS) for _ in range(rng.randrange(1, 4)))}\",0Ah,0")
+        elif roll < 0.6:
+            out.append('; ' + ' '.join(rng.choice(FRAGMENTS) for _ in range(rng.randrange(1, 4))))
+        elif roll < 0.8:
+            out.append(f"                call    {rng.choice(FRAGMENTS)}  ; {rng.choice(FRAGMENTS)}")
+        else:
+            out.append(''.join(rng.choice(FRAGMENTS + [' ', '"', "'", '\t', ' mov rax, ']) for _ in range(rng.randrange(1, 8))))
+    return '\n'.join(out) + ('\n' if seed % 2 else '')
+
+
+def per_pattern_scan(scanner, content, filename):
+    # scan_content before the anchor scan: extract_windows_paths plus one finditer per ioc_patterns entry,
+    # on the listing and on its extracted strings separately (a path must not run from one into the other)
+    result = {'file': filename}
+    result.update(scanner.extract_ida_metadata(content))
+
+    cleaned_content = scanner.clean_content(content)
+    views = [cleaned_content, '\n'.join(scanner.extract_strings(cleaned_content))]
+
+    found = {}
+    for view in views:
+        for path_type, paths in scanner.extract_windows_paths(view).items():
+            found.setdefault(path_type, set()).update(paths)
+
+    for category, pattern in scanner.ioc_patterns.items():
+        for view in views:
+            for match in pattern.finditer(view):
+                text = match.group().strip().strip('"\'')
+                if scanner.is_valid_ioc(text, category):
+                    found.setdefault(category, set()).add(text)
+    all_found_iocs = {category: sorted(matches) for category, matches in found.items() if matches}
+
+    if all_found_iocs:
+        result['iocs'] = {category: all_found_iocs[category]
+                          for category in scanner.IOC_CATEGORY_ORDER
+                          if category in all_found_iocs}
+    return result if len(result) > 1 else None
+
+
+# with the shipped lib and without any lib; the lib is read from the working directory and its automaton
+# cached next to it, so the tests run on a copy in tmp_path instead of the source tree
+def use_lib(monkeypatch, tmp_path, lib=True):
+    if lib:
+        shutil.copy(SCRIPT_DIR / IoCScanner.LIB_FILE, tmp_path / IoCScanner.LIB_FILE)
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture(params=['lib', 'no_lib'])
+def scanner(request, monkeypatch, tmp_path):
+    use_lib(monkeypatch, tmp_path, request.param == 'lib')
+    return IoCScanner(verbose=False)
+
+
+def test_fixture_matches_per_pattern_scan(scanner):
+    content = FIXTURE.read_text(encoding='utf-8')
+    expected = per_pattern_scan(scanner, content, str(FIXTURE))
+    assert expected and expected.get('iocs')
+    assert scanner.scan_content(content, str(FIXTURE)) == expected
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_fuzzed_listing_matches_per_pattern_scan(scanner, seed):
+    content = fuzzed_listing(seed)
+    assert scanner.scan_content(content, f"fuzz{seed}.asm") == per_pattern_scan(scanner, content, f"fuzz{seed}.asm")
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_stream_matches_whole_file(monkeypatch, tmp_path, seed):
+    use_lib(monkeypatch, tmp_path)
+    path = tmp_path / f"fuzz{seed}.asm"
+    path.write_text(fuzzed_listing(seed, 3000), encoding='utf-8')
+    whole = IoCScanner(verbose=False).scan_file(path)
+    # small chunks and overlap, so many matches cross a chunk end
+    assert IoCScanner(verbose=False, chunk_size=2000, overlap=600).scan_file(path) == whole
+
+
+def test_timeout_stops_a_single_long_match(monkeypatch, tmp_path):
+    # one re call that backtracks for minutes; the worker is killed at the deadline, later files still scan
+    if multiprocessing.get_start_method() != 'fork':
+        pytest.skip('the patched scan_file only reaches forked workers')
+    scan_file = IoCScanner.scan_file
+
+    def runaway(self, filepath):
+        if filepath.name == 'a_slow.asm':
+            re.match(r'(a+)+$', 'a' * 40 + 'b')
+        return scan_file(self, filepath)
+
+    monkeypatch.setattr(IoCScanner, 'scan_file', runaway)
+    use_lib(monkeypatch, tmp_path, lib=False)
+    (tmp_path / 'a_slow.asm').write_text(fuzzed_listing(1), encoding='utf-8')
+    (tmp_path / 'b_fast.asm').write_text(fuzzed_listing(2), encoding='utf-8')
+
+    started = time.monotonic()
+    results = IoCScanner(verbose=False).scan_directory(tmp_path, timeout=1)
+    assert time.monotonic() - started < 30
+    assert results[0] == {'file': str(tmp_path / 'a_slow.asm'), 'error': 'timed out after 1s'}
+    assert results[1]['file'] == str(tmp_path / 'b_fast.asm') and results[1].get('iocs')
